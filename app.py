@@ -1,87 +1,604 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, request, jsonify, render_template, send_file, Response, stream_with_context, g
 from flask_cors import CORS
+import io
 import os
 import json
+import time
+import hashlib
+import threading
+import zipfile
 from werkzeug.utils import secure_filename
 
 # Import your custom modules
-from resume_parser import ResumeParser
-from resume_generator import ResumeGenerator
-from llm import analyze_resume  # Assuming your LLM code is in llm_service.py
+from cache import TieredCache, SingleFlight
+from resume_parser import ResumeParser, PARSER_VERSION, SECTIONS
+from resume_generator import ResumeGenerator, output_name
+from resume_model import Resume, StaleFormat, load_resume
+from output_store import OutputStore, OUTPUT_MAX_AGE
+from exporters import document_id, export_name, parse_export_name, get_exporter, EXPORTERS
+from pipeline import Pipeline
+from keywords import keyword_gap, format_gap
+from candidates import CandidateStore, CANDIDATE_DB
+import metrics
+from batch import run_batch, get_parse_pool, BATCH_WORKERS
+from jobs import JobQueue, MemoryJobStore, SQLiteJobStore, QueueFull, JobCancelled
+from llm import build_prompt, analyze_prompt, analyze_prompt_stream, get_client, get_async_client, response_cache  # Assuming your LLM code is in llm_service.py
 
 app = Flask(__name__)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
-OUTPUT_FOLDER = 'output'
+OUTPUT_FOLDER = 'output'  # generated templates; see output_store.py for retention
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
+# Parse cache: repeat uploads of the same file skip extraction entirely. Parses
+# are kept in the compact binary form of resume_model.Resume (see to_bytes).
+# Set PARSE_CACHE_DB to a file path to also keep parses on disk across restarts.
+PARSE_CACHE_SIZE = 256  # entries kept in memory
+PARSE_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # on-disk tier
+PARSE_CACHE_DB = os.getenv('PARSE_CACHE_DB')
+
+# Background jobs (/api/jobs). Set JOB_DB to a file path to keep job results in SQLite.
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))  # jobs processed at once
+JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 32))  # queued + running; more gets 429
+JOB_TTL = 3600  # seconds finished jobs stay retrievable
+JOB_DB = os.getenv('JOB_DB')
+
+# Parsed resumes by document id (as Resume bytes), so /api/download can render any export format on demand.
+# Set DOCUMENT_CACHE_DB to a file path when several server processes share output/.
+DOCUMENT_CACHE_SIZE = 1024  # entries kept in memory
+DOCUMENT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # on-disk tier
+DOCUMENT_CACHE_DB = os.getenv('DOCUMENT_CACHE_DB')
+
+# Candidate ranking (/api/rank); fully parsed uploads are added to the store (see candidates.py)
+RANK_DEFAULT_K = 20
+RANK_MAX_K = 100
+
+# Batch ingestion (/api/batch). Server-side directories are only accepted below BATCH_ROOT.
+# All batches share one pool of BATCH_WORKERS parser processes; at most BATCH_MAX_RUNNING
+# run at once, and more get 429.
+BATCH_ROOT = os.getenv('BATCH_ROOT')
+BATCH_MAX_RUNNING = int(os.getenv('BATCH_MAX_RUNNING', 2))
+
 # Ensure folders exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+output_store = OutputStore(OUTPUT_FOLDER)
+
+parse_cache = TieredCache(
+    max_entries=PARSE_CACHE_SIZE,
+    max_age=PARSE_CACHE_MAX_AGE,
+    db_path=PARSE_CACHE_DB,
+    max_bytes=PARSE_CACHE_MAX_BYTES
+)
+
+document_cache = TieredCache(
+    max_entries=DOCUMENT_CACHE_SIZE,
+    max_age=OUTPUT_MAX_AGE,
+    db_path=DOCUMENT_CACHE_DB,
+    max_bytes=DOCUMENT_CACHE_MAX_BYTES
+)
+_rendering = SingleFlight()
+_batch_slots = threading.BoundedSemaphore(BATCH_MAX_RUNNING)
+
+candidate_store = CandidateStore(CANDIDATE_DB or None)
+
+# 'full' runs the local keyword gap analysis and the LLM; 'keywords' skips the LLM
+ANALYSIS_MODES = ('full', 'keywords')
+
+class UploadError(ValueError):
+    """Invalid upload form; reported to the client as a 400"""
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def read_upload():
+    """Validated upload form: (file bytes, safe filename, job description, sections, analysis mode)"""
+    # 1. Check for file
+    if 'file' not in request.files:
+        raise UploadError('No file provided')
+    
+    file = request.files['file']
+    if file.filename == '':
+        raise UploadError('No file selected')
+    if not allowed_file(file.filename):
+        raise UploadError('Invalid file type')
+    
+    try:
+        sections = requested_sections()
+        mode = analysis_mode(request.form)
+    except ValueError as e:
+        raise UploadError(str(e))
+    
+    # 2. Get Job Description from the frontend (from your new textarea)
+    job_desp = request.form.get('job_description', '')
+    return file.read(), secure_filename(file.filename), job_desp, sections, mode
+
+def requested_sections():
+    """Section names from the optional comma-separated 'sections' form field; None means all"""
+    value = request.form.get('sections', '')
+    sections = [name.strip() for name in value.split(',') if name.strip()]
+    if not sections:
+        return None
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(SECTIONS)}")
+    return sections
+
+def analysis_mode(payload):
+    """The optional 'analysis' field of a form or JSON body"""
+    mode = str(payload.get('analysis') or 'full').lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {mode}. Available: {', '.join(ANALYSIS_MODES)}")
+    return mode
+
+def request_payload():
+    """The JSON object body of the request, else its form fields"""
+    payload = request.get_json(silent=True)
+    return payload if isinstance(payload, dict) and payload else request.form
+
+def job_description(payload):
+    """The optional 'job_description' field of a form or JSON body"""
+    job_desp = payload.get('job_description') or ''
+    if not isinstance(job_desp, str):
+        raise ValueError('job_description must be a string')
+    return job_desp
+
+def parse_resume(data, filename, sections=None):
+    """Parse uploaded bytes in memory, reusing an earlier parse of identical content
+    
+    With sections, only those are extracted, unless a full parse is already cached.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    cache_key = f"{hashlib.sha256(data).hexdigest()}:{ext}:{PARSER_VERSION}"
+    cached = cached_resume(parse_cache, cache_key)
+    if cached is not None:
+        resume_data = cached.to_dict()
+        if sections is None:
+            return resume_data
+        return {name: value for name, value in resume_data.items() if name in sections}
+    
+    if sections is not None:
+        cache_key += ':' + ','.join(name for name in SECTIONS if name in sections)
+        cached = cached_resume(parse_cache, cache_key)
+        if cached is not None:
+            return cached.to_dict()
+    resume = ResumeParser().parse_model(data, filename, sections=sections)
+    parse_cache.put(cache_key, resume.to_bytes())
+    return resume.to_dict()
+
+def cached_resume(cache, key):
+    """Resume cached under key, or None; entries another Python version wrote count as missing"""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    try:
+        return load_resume(cached)
+    except StaleFormat:
+        cache.delete(key)
+        return None
+
+def export_names(doc_id):
+    return {fmt: export_name(doc_id, fmt) for fmt in EXPORTERS}
+
+def register_document(resume_data):
+    """Remember resume_data for on-demand exports, re-analysis and ranking; return its id and export names"""
+    doc_id = document_id(resume_data)
+    store_document(doc_id, resume_data)
+    # Partial parses would rank below the full resume they were cut from
+    if all(name in resume_data for name in SECTIONS):
+        candidate_store.add(doc_id, resume_data)
+    return doc_id, export_names(doc_id)
+
+def store_document(doc_id, resume_data):
+    document_cache.put(doc_id, Resume.from_dict(resume_data).to_bytes())
+
+def stored_resume(doc_id):
+    """Resume stored for a document id, or None if unknown or expired"""
+    return cached_resume(document_cache, doc_id)
+
+def analyze(pipeline, doc_id, resume_data, job_desp, mode='full'):
+    """Keyword gap analysis, then the LLM analysis unless mode is 'keywords'
+    
+    If the LLM call fails, the keyword gap report stands in for its analysis
+    and the error is returned as llm_error.
+    """
+    gap = pipeline.run('keywords', keyword_gap, resume_data, job_desp)
+    result = {'keyword_gap': gap}
+    if mode == 'keywords':
+        result['llm_analysis'] = format_gap(gap)
+    else:
+        try:
+            # Compact text of resume_data and the job description, within the prompt token budget
+            prompt = pipeline.run('prompt', build_prompt, resume_data, job_desp)
+            result['prompt'] = prompt.report
+            result['llm_analysis'] = pipeline.run('analysis', analyze_prompt, prompt)
+        except Exception as e:
+            result['llm_analysis'] = format_gap(gap)
+            result['llm_error'] = str(e)
+    return analysis_result(pipeline, doc_id, resume_data, result)
+
+def analysis_result(pipeline, doc_id, resume_data, analysis):
+    """Response body of an upload or re-analysis"""
+    exports = export_names(doc_id)
+    return {
+        'success': True,
+        'resume_data': resume_data,
+        **analysis,
+        'document_id': doc_id,
+        'output_file': exports['docx'],
+        'exports': exports,
+        'timings': pipeline.timings_ms()  # milliseconds per stage
+    }
+
+def process_resume(data, filename, job_desp, is_cancelled=lambda: False, sections=None, mode='full'):
+    """Parse and analyze one upload; documents are rendered when first downloaded"""
+    pipeline = Pipeline()
+    
+    # Parse resume to get structured data (cached by file content)
+    resume_data = pipeline.run('parse', parse_resume, data, filename, sections)
+    if is_cancelled():
+        raise JobCancelled()
+    doc_id, _ = register_document(resume_data)
+    return analyze(pipeline, doc_id, resume_data, job_desp, mode)
+
+def run_job(payload, is_cancelled):
+    return process_resume(payload['data'], payload['filename'], payload['job_description'], is_cancelled,
+                          payload.get('sections'), payload.get('analysis', 'full'))
+
+job_queue = JobQueue(
+    run_job,
+    store=SQLiteJobStore(JOB_DB) if JOB_DB else MemoryJobStore(),
+    workers=JOB_WORKERS,
+    max_pending=JOB_MAX_PENDING,
+    ttl=JOB_TTL
+)
+
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    g.trace_token = metrics.start_trace()
+
+@app.after_request
+def record_request_timing(response):
+    # Streaming responses are timed up to their first byte
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or 'unknown'
+    if metrics.METRICS_ENABLED:
+        metrics.registry.observe('jobsper_http_request_duration_seconds', elapsed, 'Time to produce a response',
+                                 method=request.method, endpoint=endpoint, status=response.status_code)
+    metrics.end_trace(g.trace_token, method=request.method, path=request.path, endpoint=endpoint,
+                      status=response.status_code, duration_ms=round(elapsed * 1000, 2))
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
-    # 1. Check for file
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+    try:
+        data, filename, job_desp, sections, mode = read_upload()
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
     
-    file = request.files['file']
-    # 2. Get Job Description from the frontend (from your new textarea)
+    try:
+        # 3. Parse (only the requested sections), then analyze
+        result = process_resume(data, filename, job_desp, sections=sections, mode=mode)
+        
+        # 4. Return EVERYTHING back to the HTML
+        # (llm_analysis displays in your <pre> box)
+        return jsonify(result), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue an upload for background processing; poll GET /api/jobs/<id> for the result"""
+    try:
+        data, filename, job_desp, sections, mode = read_upload()
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        job_id = job_queue.submit({
+            'data': data,
+            'filename': filename,
+            'job_description': job_desp,
+            'sections': sections,
+            'analysis': mode
+        })
+    except QueueFull as e:
+        return jsonify({'error': f'Server busy: {e}'}), 429, {'Retry-After': '5'}
+    
+    return jsonify({'job_id': job_id, 'status': 'queued'}), 202, {'Location': f'/api/jobs/{job_id}'}
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if job_queue.cancel(job_id):
+        return jsonify({'job_id': job_id, 'status': 'cancelled'}), 200
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'error': 'Job already finished'}), 409
+
+@app.route('/api/batch', methods=['POST'])
+def batch_upload():
+    """Parse a ZIP upload (or a directory under BATCH_ROOT), streaming JSON Lines results"""
+    archive = request.files.get('file')
+    directory = request.form.get('directory', '')
+    run_llm = request.form.get('analyze', '').lower() in ('1', 'true', 'yes')
     job_desp = request.form.get('job_description', '')
     
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+    if archive and archive.filename:
+        if not archive.filename.lower().endswith('.zip'):
+            return jsonify({'error': 'Batch upload must be a ZIP archive'}), 400
+        # Read now: the upload stream is closed before the response body is generated
+        source = io.BytesIO(archive.read())
+        if not zipfile.is_zipfile(source):
+            return jsonify({'error': 'Batch upload is not a valid ZIP archive'}), 400
+    elif directory:
+        if not BATCH_ROOT:
+            return jsonify({'error': 'Directory batches are disabled'}), 403
+        root = os.path.realpath(BATCH_ROOT)
+        source = os.path.realpath(os.path.join(root, directory))
+        if os.path.commonpath([root, source]) != root or not os.path.isdir(source):
+            return jsonify({'error': 'Directory not found'}), 404
+    else:
+        return jsonify({'error': 'No file or directory provided'}), 400
     
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
+    if not _batch_slots.acquire(blocking=False):
+        return jsonify({'error': f'Server busy: {BATCH_MAX_RUNNING} batches already running'}), 429, \
+            {'Retry-After': '5'}
+    
+    def results():
         try:
-            # 3. Parse resume to get structured data
-            parser = ResumeParser()
-            resume_data = parser.parse(filepath)
-            
-            # 4. Call your LLM function for Analysis
-            # We convert resume_data (dict) to a string so Perplexity can read it
-            analysis_text = analyze_resume(json.dumps(resume_data), job_desp)
-            
-            # 5. Generate the document template
-            generator = ResumeGenerator()
-            output_path = generator.generate(resume_data, filename)
-            
-            # 6. Return EVERYTHING back to the HTML
-            return jsonify({
-                'success': True,
-                'resume_data': resume_data,
-                'llm_analysis': analysis_text,  # This displays in your <pre> box
-                'output_file': os.path.basename(output_path)
-            }), 200
-
+            for result in run_batch(source, workers=BATCH_WORKERS, analyze=run_llm, job_description=job_desp,
+                                    parse_pool=get_parse_pool()):
+                if 'resume_data' in result:
+                    result['document_id'] = document_id(result['resume_data'])
+                    candidate_store.add(result['document_id'], result['resume_data'])
+                yield json.dumps(result, ensure_ascii=False) + '\n'
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            yield json.dumps({'error': str(e)}) + '\n'
     
-    return jsonify({'error': 'Invalid file type'}), 400
+    response = Response(stream_with_context(results()), mimetype='application/x-ndjson')
+    # Runs even if the body is never read
+    response.call_on_close(_batch_slots.release)
+    return response
+
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/upload/stream', methods=['POST'])
+def upload_file_stream():
+    """Like /api/upload, but streams the LLM analysis as server-sent events.
+
+    Events, in order: resume_data, keywords (the local keyword gap), token
+    (repeated), then done with the export file names, preceded by error if
+    the LLM analysis fails after its first token.
+    """
+    try:
+        data, filename, job_desp, sections, mode = read_upload()
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    pipeline = Pipeline()
+    
+    # Parse before streaming starts, so parse errors still get a normal JSON response
+    try:
+        resume_data = pipeline.run('parse', parse_resume, data, filename, sections)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    doc_id, _ = register_document(resume_data)
+    return analysis_stream(pipeline, doc_id, resume_data, job_desp, mode)
+
+def stream_done(pipeline, doc_id, prompt=None, llm_error=None):
+    """Payload of the final 'done' event of an analysis stream, with the size report of its prompt"""
+    exports = export_names(doc_id)
+    done = {
+        'document_id': doc_id,
+        'output_file': exports['docx'],
+        'exports': exports,
+        'timings': pipeline.timings_ms()
+    }
+    if prompt is not None:
+        done['prompt'] = prompt.report
+    if llm_error:
+        done['llm_error'] = llm_error
+    return done
+
+def analysis_stream(pipeline, doc_id, resume_data, job_desp, mode='full'):
+    """SSE response: resume_data, keywords, the analysis as token events, then done
+    
+    If the LLM fails before its first token, the keyword gap report is streamed in
+    its place; if it fails midway, an error event comes before done.
+    """
+    def events():
+        yield sse_event('resume_data', resume_data)
+        gap = pipeline.run('keywords', keyword_gap, resume_data, job_desp)
+        yield sse_event('keywords', gap)
+        prompt = None
+        llm_error = None
+        if mode == 'keywords':
+            yield sse_event('token', {'text': format_gap(gap)})
+        else:
+            started = False
+            try:
+                prompt = pipeline.run('prompt', build_prompt, resume_data, job_desp)
+                start = time.perf_counter()
+                for text in analyze_prompt_stream(prompt):
+                    started = True
+                    yield sse_event('token', {'text': text})
+            except Exception as e:
+                llm_error = str(e)
+                if started:
+                    yield sse_event('error', {'error': llm_error})
+                else:
+                    # No analysis yet (LLM refused, unreachable or failing): the keyword gap report stands in
+                    yield sse_event('token', {'text': format_gap(gap)})
+            else:
+                pipeline.record('analysis', time.perf_counter() - start)
+                if metrics.METRICS_ENABLED:
+                    metrics.observe_span('analyze_prompt_stream', time.perf_counter() - start)
+        # The document is parsed and registered either way, so its exports are always offered
+        yield sse_event('done', stream_done(pipeline, doc_id, prompt, llm_error))
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def stored_document():
+    """(document_id, resume_data, job description, analysis mode) from a JSON or form body
+    
+    resume_data is None if the document is unknown or expired.
+    """
+    payload = request_payload()
+    doc_id = str(payload.get('document_id', ''))
+    job_desp = job_description(payload)
+    resume = stored_resume(doc_id) if doc_id else None
+    return doc_id, resume.to_dict() if resume else None, job_desp, analysis_mode(payload)
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze_document():
+    """Re-run only the analysis of an earlier upload against a new job description"""
+    try:
+        doc_id, resume_data, job_desp, mode = stored_document()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if resume_data is None:
+        return jsonify({'error': 'Unknown or expired document_id; upload the resume again'}), 404
+    return jsonify(analyze(Pipeline(), doc_id, resume_data, job_desp, mode)), 200
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_document_stream():
+    """Like /api/analyze, streaming the analysis with the same events as /api/upload/stream"""
+    try:
+        doc_id, resume_data, job_desp, mode = stored_document()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if resume_data is None:
+        return jsonify({'error': 'Unknown or expired document_id; upload the resume again'}), 404
+    return analysis_stream(Pipeline(), doc_id, resume_data, job_desp, mode)
+
+@app.route('/api/rank', methods=['POST'])
+def rank_candidates():
+    """Rank every stored candidate against a job description; returns the top_k"""
+    payload = request_payload()
+    try:
+        job_desp = job_description(payload)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not job_desp.strip():
+        return jsonify({'error': 'No job description provided'}), 400
+    try:
+        top_k = min(int(payload.get('top_k') or RANK_DEFAULT_K), RANK_MAX_K)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    
+    pipeline = Pipeline()
+    include_email = str(payload.get('include_email', '')).lower() in ('1', 'true', 'yes')
+    results = pipeline.run('rank', candidate_store.rank, job_desp, top_k, include_email)
+    # Make the ranked resumes available to /api/analyze and /api/download
+    for result in results:
+        if stored_resume(result['document_id']) is None:
+            resume_data = candidate_store.get(result['document_id'])
+            if resume_data is not None:
+                store_document(result['document_id'], resume_data)
+    
+    return jsonify({
+        'candidates': len(candidate_store),
+        'results': results,
+        'timings': pipeline.timings_ms()
+    }), 200
+
+@app.route('/api/candidates/<doc_id>', methods=['DELETE'])
+def delete_candidate(doc_id):
+    """Forget an uploaded resume: its candidate entry, stored resume_data and rendered Word document"""
+    resume = stored_resume(doc_id)
+    if resume is None:
+        resume_data = candidate_store.get(doc_id)
+        resume = Resume.from_dict(resume_data) if resume_data is not None else None
+    if resume is not None:
+        document_cache.delete(doc_id)
+        output_store.delete(output_name(resume))
+    found = candidate_store.delete(doc_id)
+    if resume is None and not found:
+        return jsonify({'error': 'Unknown document_id'}), 404
+    return jsonify({'document_id': doc_id, 'status': 'deleted'}), 200
+
+@app.route('/api/health')
+def health():
+    return jsonify({
+        'status': 'ok',
+        'llm': get_client().metrics(),
+        'llm_async': get_async_client().metrics(),
+        'llm_cache': response_cache.stats(),
+        'parse_cache': parse_cache.stats(),
+        'document_cache': document_cache.stats(),
+        'candidates': len(candidate_store),
+        'jobs': job_queue.stats()
+    }), 200
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Span and request latency histograms in the Prometheus text format"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/download/<filename>')
 def download_file(filename):
-    filepath = os.path.join(app.config['OUTPUT_FOLDER'], filename)
-    if os.path.exists(filepath):
-        return send_file(filepath, as_attachment=True)
-    return jsonify({'error': 'File not found'}), 404
+    """Serve a stored file, or render an export of an uploaded resume on first request"""
+    filename = secure_filename(filename)
+    filepath = output_store.get(filename)
+    if filepath:
+        return send_file(os.path.abspath(filepath), as_attachment=True)
+    
+    export = parse_export_name(filename)
+    resume = stored_resume(export[0]) if export else None
+    if resume is None:
+        return jsonify({'error': 'File not found'}), 404
+    
+    exporter = get_exporter(export[1])
+    if exporter.name == 'docx':
+        # Slow to build, so keep it in the output store; concurrent downloads share one render
+        generator = ResumeGenerator(output_store)
+        filepath = _rendering.do(filename, lambda: generator.generate(resume, filename))
+        return send_file(os.path.abspath(filepath), mimetype=exporter.mimetype,
+                         as_attachment=True, download_name=filename)
+    return send_file(io.BytesIO(exporter.export(resume)), mimetype=exporter.mimetype,
+                     as_attachment=exporter.attachment, download_name=filename)
+
+@app.route('/api/render', methods=['POST'])
+def render_document():
+    """Render resume_data (JSON body) in any export format, without touching disk"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or payload.get('resume_data') is None:
+        return jsonify({'error': 'resume_data is required'}), 400
+    
+    try:
+        resume = Resume.from_dict(payload['resume_data'])
+        exporter = get_exporter(request.args.get('format', 'docx'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return send_file(
+        io.BytesIO(exporter.export(resume)),
+        mimetype=exporter.mimetype,
+        as_attachment=exporter.attachment,
+        download_name=f'resume_template.{exporter.extension}'
+    )
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
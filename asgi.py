@@ -0,0 +1,333 @@
+"""Async serving mode: run with an ASGI server, e.g. `uvicorn asgi:app`.
+
+Uploads and analyses (/api/upload, /api/analyze and their /stream variants)
+are handled on the event loop: the form is read and the resume parsed on
+threads, and the LLM call is awaited with AsyncOpenAI, so a waiting analysis
+holds no thread. Every other request, and anything these handlers do not
+accept, is passed to the Flask app in app.py on a thread pool, so responses
+are the same in both modes.
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from app import (app as flask_app, read_upload, UploadError, stored_document, parse_resume, register_document,
+                 analysis_result, stream_done, sse_event)
+from keywords import keyword_gap, format_gap
+from llm import build_prompt, analyze_prompt_async, analyze_prompt_stream_async, get_async_client
+from pipeline import Pipeline
+
+# Threads for requests passed to the Flask app and for reading upload forms
+ASGI_WORKERS = int(os.getenv('ASGI_WORKERS', 32))
+
+wsgi_executor = ThreadPoolExecutor(max_workers=ASGI_WORKERS, thread_name_prefix='wsgi')
+
+SSE_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its (already read) body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = 'HTTP_' + name
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def read_body(receive, limit):
+    """The request body, cut short once it is longer than limit; None if the client went away"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        chunks.append(chunk)
+        size += len(chunk)
+        if not message.get('more_body', False) or (limit is not None and size > limit):
+            return b''.join(chunks)
+
+
+def _run_wsgi(environ, send, loop):
+    """Run the Flask app in this thread, sending its response through the event loop"""
+    def send_sync(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    def send_start():
+        if not response.get('sent'):
+            response['sent'] = True
+            send_sync({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+
+    body = flask_app(environ, start_response)
+    try:
+        # The whole body is produced in this one thread: streamed responses keep their request context
+        for chunk in body:
+            send_start()
+            if chunk:
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        send_start()
+        send_sync({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+
+async def call_flask(environ, send):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(wsgi_executor, _run_wsgi, environ, send, loop)
+
+
+def _cors(environ):
+    # Same header flask-cors adds to the Flask app's responses
+    return [(b'access-control-allow-origin', b'*')] if 'HTTP_ORIGIN' in environ else []
+
+
+async def send_json(send, environ, data, status=200):
+    body = flask_app.json.dumps(data).encode('utf-8') + b'\n'
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers + _cors(environ)})
+    await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+
+async def send_events(send, receive, environ, events):
+    """Stream server-sent events, stopping early if the client disconnects"""
+    await send({'type': 'http.response.start', 'status': 200, 'headers': SSE_HEADERS + _cors(environ)})
+
+    async def pump():
+        async for event in events:
+            await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    streaming = asyncio.ensure_future(pump())
+    watcher = asyncio.ensure_future(disconnected())
+    await asyncio.wait({streaming, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    watcher.cancel()
+    if not streaming.done():
+        # Abandon the LLM stream; cancelling it closes the upstream connection
+        streaming.cancel()
+    await asyncio.gather(streaming, return_exceptions=True)
+
+
+async def analyze(pipeline, doc_id, resume_data, job_desp, mode):
+    """app.analyze, awaiting the LLM"""
+    gap = pipeline.run('keywords', keyword_gap, resume_data, job_desp)
+    result = {'keyword_gap': gap}
+    if mode == 'keywords':
+        result['llm_analysis'] = format_gap(gap)
+    else:
+        try:
+            prompt = pipeline.run('prompt', build_prompt, resume_data, job_desp)
+            result['prompt'] = prompt.report
+            result['llm_analysis'] = await pipeline.wait('analysis', analyze_prompt_async(prompt))
+        except Exception as e:
+            result['llm_analysis'] = format_gap(gap)
+            result['llm_error'] = str(e)
+    return analysis_result(pipeline, doc_id, resume_data, result)
+
+
+async def analysis_events(pipeline, doc_id, resume_data, job_desp, mode):
+    """The events of app.analysis_stream, awaiting the LLM"""
+    yield sse_event('resume_data', resume_data)
+    gap = pipeline.run('keywords', keyword_gap, resume_data, job_desp)
+    yield sse_event('keywords', gap)
+    prompt = None
+    llm_error = None
+    if mode == 'keywords':
+        yield sse_event('token', {'text': format_gap(gap)})
+    else:
+        started = False
+        try:
+            prompt = pipeline.run('prompt', build_prompt, resume_data, job_desp)
+            start = time.perf_counter()
+            async for text in analyze_prompt_stream_async(prompt):
+                started = True
+                yield sse_event('token', {'text': text})
+        except Exception as e:
+            llm_error = str(e)
+            if started:
+                yield sse_event('error', {'error': llm_error})
+            else:
+                # No analysis yet (LLM refused, unreachable or failing): the keyword gap report stands in
+                yield sse_event('token', {'text': format_gap(gap)})
+        else:
+            pipeline.record('analysis', time.perf_counter() - start)
+            if metrics.METRICS_ENABLED:
+                metrics.observe_span('analyze_prompt_stream', time.perf_counter() - start)
+    yield sse_event('done', stream_done(pipeline, doc_id, prompt, llm_error))
+
+
+async def parse_upload(environ, send):
+    """Read, validate and parse an upload: (pipeline, doc_id, resume_data, job_desp, mode), or None once a
+    response was sent"""
+    loop = asyncio.get_running_loop()
+
+    def read():
+        with flask_app.request_context(environ):
+            return read_upload()
+
+    try:
+        data, filename, job_desp, sections, mode = await loop.run_in_executor(wsgi_executor, read)
+    except UploadError as e:
+        await send_json(send, environ, {'error': str(e)}, 400)
+        return None
+
+    pipeline = Pipeline()
+    try:
+        resume_data = await pipeline.offload('parse', parse_resume, data, filename, sections)
+        doc_id, _ = await loop.run_in_executor(wsgi_executor, register_document, resume_data)
+    except Exception as e:
+        await send_json(send, environ, {'error': str(e)}, 500)
+        return None
+    return pipeline, doc_id, resume_data, job_desp, mode
+
+
+async def load_document(environ, send):
+    """stored_document() for an /api/analyze request, or None once an error response was sent"""
+    def read():
+        with flask_app.request_context(environ):
+            return stored_document()
+
+    try:
+        doc_id, resume_data, job_desp, mode = await asyncio.get_running_loop().run_in_executor(wsgi_executor, read)
+    except ValueError as e:
+        await send_json(send, environ, {'error': str(e)}, 400)
+        return None
+    if resume_data is None:
+        await send_json(send, environ, {'error': 'Unknown or expired document_id; upload the resume again'}, 404)
+        return None
+    return Pipeline(), doc_id, resume_data, job_desp, mode
+
+
+async def upload_file(environ, send, receive):
+    upload = await parse_upload(environ, send)
+    if upload is None:
+        return
+    try:
+        result = await analyze(*upload)
+    except Exception as e:
+        await send_json(send, environ, {'error': str(e)}, 500)
+    else:
+        await send_json(send, environ, result)
+
+
+async def upload_file_stream(environ, send, receive):
+    upload = await parse_upload(environ, send)
+    if upload is not None:
+        await send_events(send, receive, environ, analysis_events(*upload))
+
+
+async def analyze_document(environ, send, receive):
+    document = await load_document(environ, send)
+    if document is not None:
+        await send_json(send, environ, await analyze(*document))
+
+
+async def analyze_document_stream(environ, send, receive):
+    document = await load_document(environ, send)
+    if document is not None:
+        await send_events(send, receive, environ, analysis_events(*document))
+
+
+# (method, path) -> handler, named after the Flask view it replaces
+ROUTES = {
+    ('POST', '/api/upload'): upload_file,
+    ('POST', '/api/upload/stream'): upload_file_stream,
+    ('POST', '/api/analyze'): analyze_document,
+    ('POST', '/api/analyze/stream'): analyze_document_stream,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await get_async_client().aclose()
+            wsgi_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    limit = flask_app.config.get('MAX_CONTENT_LENGTH')
+    body = await read_body(receive, limit)
+    if body is None:
+        return
+    if limit is not None and len(body) > limit:
+        # Flask answers with its usual 413 without reading the body
+        return await call_flask(wsgi_environ(scope, body), send)
+
+    environ = wsgi_environ(scope, body)
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await call_flask(environ, send)
+
+    # Timed like the Flask app's before/after_request hooks: up to the start of the response
+    start = time.perf_counter()
+    token = metrics.start_trace()
+    response = {}
+
+    async def timed_send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['elapsed'] = time.perf_counter() - start
+        await send(message)
+
+    await handler(environ, timed_send, receive)
+    if 'status' not in response:
+        return
+    status, elapsed = response['status'], response['elapsed']
+    if metrics.METRICS_ENABLED:
+        metrics.registry.observe('jobsper_http_request_duration_seconds', elapsed, 'Time to produce a response',
+                                 method=scope['method'], endpoint=handler.__name__, status=status)
+    metrics.end_trace(token, method=scope['method'], path=scope['path'], endpoint=handler.__name__,
+                      status=status, duration_ms=round(elapsed * 1000, 2))
@@ -0,0 +1,212 @@
+"""Bulk resume ingestion.
+
+Parses every resume in a directory or ZIP archive on a process pool and
+yields one JSON-serializable result per file. A file that fails to parse
+produces an error record instead of stopping the batch. The LLM analysis
+is optional and rate-limited.
+
+    python -m batch resumes.zip > results.jsonl
+    python -m batch resumes/ --analyze --job-description jd.txt --llm-rate 0.5
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from resume_parser import ResumeParser, worker_context
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.txt')
+MAX_FILE_BYTES = 16 * 1024 * 1024  # same limit as a single upload
+BATCH_WORKERS = os.cpu_count() or 1
+LLM_RATE = 1.0  # analyses started per second
+LLM_CONCURRENCY = 4
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool(workers=BATCH_WORKERS):
+    """Process pool shared by every batch run in this process, e.g. by the web server's /api/batch"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=max(1, workers), mp_context=worker_context())
+        return _parse_pool
+
+
+class RateLimiter:
+    """Token bucket: acquire() blocks until a call is allowed"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def iter_sources(source):
+    """Yield (name, bytes or None, error) for each resume in a directory or ZIP.
+
+    source is a directory path, a ZIP file path, or a binary stream holding a
+    ZIP archive. Unsupported files are skipped; oversized ones yield an error.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, source)
+                if os.path.getsize(path) > MAX_FILE_BYTES:
+                    yield rel, None, 'File too large'
+                    continue
+                with open(path, 'rb') as f:
+                    yield rel, f.read(), None
+        return
+
+    if not zipfile.is_zipfile(source):
+        raise ValueError('Batch source must be a directory or a ZIP archive')
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith('__MACOSX/') or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if info.file_size > MAX_FILE_BYTES:
+                yield name, None, 'File too large'
+                continue
+            yield name, archive.read(info), None
+
+
+def parse_file(name, data, sections=None):
+    """Parse one file; runs in a pool worker"""
+    start = time.perf_counter()
+    try:
+        # The batch is already spread over processes, so keep PDFs in this one
+        parser = ResumeParser(pdf_workers=1)
+        resume_data = parser.parse(data, name, sections=sections)
+    except Exception as e:
+        return {'file': name, 'error': f'{type(e).__name__}: {e}'}
+    return {'file': name, 'resume_data': resume_data,
+            'parse_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _analyze(result, job_description, limiter):
+    from llm import analyze_resume
+
+    limiter.acquire()
+    try:
+        result['llm_analysis'] = analyze_resume(result['resume_data'], job_description)
+    except Exception as e:
+        result['llm_error'] = f'{type(e).__name__}: {e}'
+    return result
+
+
+def run_batch(source, workers=BATCH_WORKERS, analyze=False, job_description='',
+              llm_rate=LLM_RATE, llm_concurrency=LLM_CONCURRENCY, sections=None, parse_pool=None):
+    """Yield one result dict per file, in completion order; sections limits what is extracted
+
+    Files are parsed on parse_pool if given (which is left running), else on
+    a pool of workers processes started for this batch.
+    """
+    limiter = RateLimiter(llm_rate)
+    files = iter_sources(source)
+    # Bound the files held in memory at once
+    max_pending = max(1, workers) * 4
+
+    with contextlib.ExitStack() as stack:
+        if parse_pool is None:
+            parse_pool = stack.enter_context(
+                ProcessPoolExecutor(max_workers=max(1, workers), mp_context=worker_context()))
+        llm_pool = stack.enter_context(ThreadPoolExecutor(max_workers=llm_concurrency))
+        parsing = set()
+        analyzing = set()
+        # A batch stopped early (e.g. its client went away) leaves no work queued behind it
+        stack.callback(lambda: [future.cancel() for future in parsing | analyzing])
+        exhausted = False
+
+        while True:
+            while not exhausted and len(parsing) < max_pending:
+                item = next(files, None)
+                if item is None:
+                    exhausted = True
+                    break
+                name, data, error = item
+                if error:
+                    yield {'file': name, 'error': error}
+                    continue
+                parsing.add(parse_pool.submit(parse_file, name, data, sections))
+
+            if not parsing and not analyzing:
+                return
+
+            done, _ = wait(parsing | analyzing, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if future in parsing:
+                    parsing.discard(future)
+                    if analyze and 'error' not in result:
+                        analyzing.add(llm_pool.submit(_analyze, result, job_description, limiter))
+                        continue
+                else:
+                    analyzing.discard(future)
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m batch', description='Parse a directory or ZIP of resumes to JSON Lines.')
+    parser.add_argument('source', help='directory or .zip archive of resumes')
+    parser.add_argument('-o', '--output', help='write JSON Lines here instead of stdout')
+    parser.add_argument('-w', '--workers', type=int, default=BATCH_WORKERS, help='parser processes')
+    parser.add_argument('--analyze', action='store_true', help='also run the LLM analysis')
+    parser.add_argument('--job-description', help='file with the job description for --analyze')
+    parser.add_argument('--llm-rate', type=float, default=LLM_RATE, help='LLM calls started per second')
+    parser.add_argument('--sections', help='comma-separated sections to extract, e.g. personal_info,skills')
+    args = parser.parse_args(argv)
+    sections = args.sections.split(',') if args.sections else None
+
+    job_description = ''
+    if args.job_description:
+        with open(args.job_description, 'r', encoding='utf-8') as f:
+            job_description = f.read()
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    start = time.perf_counter()
+    count = errors = 0
+    try:
+        for result in run_batch(args.source, workers=args.workers, analyze=args.analyze,
+                                job_description=job_description, llm_rate=args.llm_rate, sections=sections):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+            count += 1
+            errors += 'error' in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f'{count} files, {errors} errors, {elapsed:.1f}s ({count / elapsed if elapsed else 0:.1f} files/s)',
+          file=sys.stderr)
+    return 1 if count and errors == count else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
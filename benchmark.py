@@ -0,0 +1,380 @@
+"""Parser benchmark on a synthetic corpus.
+
+Generates English and Chinese resumes as TXT, DOCX and PDF at several page
+counts, parses each one while timing every parser stage and document
+generation, measures peak Python memory, and checks the parsed fields
+against the ground truth the resume was generated from. The report is
+JSON; pass a stored report as --baseline to flag slowdowns and accuracy
+drops (the exit status is 1 when there are any).
+
+    python -m benchmark -o bench.json
+    python -m benchmark --pages 1,10 --baseline bench.json --threshold 0.2
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from docx import Document
+
+from output_store import OutputStore
+from resume_generator import ResumeGenerator, new_document
+from resume_parser import ResumeParser, PARSER_VERSION
+
+LOCALES = ('en', 'zh')
+FORMATS = ('txt', 'docx', 'pdf')
+PAGE_SIZES = (1, 5, 20, 50)
+LINES_PER_PAGE = 50
+REPEAT = 3
+THRESHOLD = 0.2  # allowed slowdown against the baseline, as a fraction
+MIN_REGRESSION_MS = 1.0  # ignore differences below timer noise
+
+# Ground truth fields checked after parsing
+ACCURACY_FIELDS = ('name', 'email', 'phone', 'linkedin', 'github', 'skills')
+
+# Vocabulary avoids every section keyword, so filler lines never start a section
+CORPUS = {
+    'en': {
+        'names': ['Jane Doe', 'John Smith', 'Maria Garcia', 'Wei Chen', 'Amit Patel', 'Sara Lee'],
+        'summary_title': 'Summary',
+        'summary': 'Engineer focused on reliable backend systems and clear documentation.',
+        'work_title': 'Experience',
+        'roles': ['Software Engineer', 'Senior Engineer', 'Data Engineer', 'Team Lead'],
+        'employers': ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries'],
+        'duties': [
+            'Led a team of five engineers to deliver a billing platform',
+            'Reduced API latency by forty percent through caching',
+            'Designed an event pipeline processing ten million records daily',
+            'Mentored new hires and ran weekly code reviews',
+            'Migrated legacy services to containers with zero downtime',
+            'Built dashboards that cut incident response time in half',
+        ],
+        'education_title': 'Education',
+        'education': ['Stanford University', 'Bachelor of Science in Computer Science'],
+        'skills_title': 'Skills',
+        'skills': ['Python', 'SQL', 'Docker', 'Kubernetes', 'React', 'Go', 'Terraform', 'Redis', 'Kafka', 'AWS'],
+    },
+    'zh': {
+        'names': ['张伟', '王芳', '李娜', '刘洋', '陈静', '杨帆'],
+        'summary_title': '个人简介',
+        'summary': '专注后端系统稳定性与文档质量的软件工程师。',
+        'work_title': '工作经历',
+        'roles': ['软件工程师', '高级工程师', '数据工程师', '团队负责人'],
+        'employers': ['字节跳动', '阿里巴巴', '腾讯', '美团', '京东'],
+        'duties': [
+            '带领五人团队交付计费平台',
+            '通过缓存将接口延迟降低百分之四十',
+            '设计每日处理一千万条记录的事件管道',
+            '指导新同事并组织每周代码评审',
+            '将旧服务迁移到容器且零停机',
+            '搭建监控看板使故障响应时间减半',
+        ],
+        'education_title': '教育背景',
+        'education': ['清华大学', '计算机科学 本科'],
+        'skills_title': '专业技能',
+        'skills': ['Python', 'SQL', 'Docker', 'Kubernetes', 'React', 'Go', 'Terraform', 'Redis', 'Kafka', 'AWS'],
+    },
+}
+
+
+def make_resume(locale, pages, seed=0):
+    """Return (lines, ground truth) for a synthetic resume of about `pages` pages"""
+    vocab = CORPUS[locale]
+    rng = random.Random(f'{locale}:{pages}:{seed}')
+    name = rng.choice(vocab['names'])
+    slug = f'user{rng.randrange(1000, 9999)}'
+    truth = {
+        'name': name,
+        'email': f'{slug}@example.com',
+        'linkedin': f'https://linkedin.com/in/{slug}',
+        'github': f'https://github.com/{slug}',
+        'skills': sorted(rng.sample(vocab['skills'], 6)),
+    }
+    # Written as people do; the parser reports E.164
+    if locale == 'zh':
+        phone = f'1{rng.choice("3456789")}{rng.randrange(10 ** 8, 10 ** 9)}'
+        truth['phone'] = '+86' + phone
+    else:
+        area, exchange, line = rng.randrange(200, 999), rng.randrange(200, 999), rng.randrange(1000, 9999)
+        phone = f'+1 ({area}) {exchange}-{line}'
+        truth['phone'] = f'+1{area}{exchange}{line}'
+
+    head = [name, f"{truth['email']} | {phone}", f'linkedin.com/in/{slug} | github.com/{slug}', '',
+            vocab['summary_title'], vocab['summary'], '', vocab['work_title']]
+    tail = ['', vocab['education_title']] + vocab['education'] + [f'{2010 + rng.randrange(5)} - 2014', '',
+                                                                 vocab['skills_title'], ', '.join(truth['skills'])]
+
+    body = []
+    year = 2024
+    target = max(1, pages) * LINES_PER_PAGE - len(head) - len(tail)
+    while len(body) < target:
+        role, employer = rng.choice(vocab['roles']), rng.choice(vocab['employers'])
+        body.append(f'{role} at {employer}' if locale == 'en' else f'{role} | {employer}')
+        body.append(f'{year - 2} - {year}')
+        body.extend(rng.sample(vocab['duties'], 4))
+        body.append('')
+        year -= 2
+    return head + body[:target] + tail, truth
+
+
+def to_txt(lines):
+    return '\n'.join(lines).encode('utf-8')
+
+
+def to_docx(lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(lines):
+    """Minimal PDF, LINES_PER_PAGE lines per page.
+
+    Text is written with a CID font in Identity-H encoding, two bytes per
+    character, and a ToUnicode map, so extractors recover CJK text without
+    any font being embedded.
+    """
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    chars = sorted({ord(char) for line in lines for char in line} | {32})
+    to_unicode = '\n'.join(
+        ['/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+         '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+         '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+         '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange']
+        + [part for start in range(0, len(chars), 100) for part in
+           [f'{len(chars[start:start + 100])} beginbfchar']
+           + [f'<{code:04X}> <{code:04X}>' for code in chars[start:start + 100]]
+           + ['endbfchar']]
+        + ['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end']
+    ).encode('ascii')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in below
+        b'<< /Type /Font /Subtype /Type0 /BaseFont /SimSun /Encoding /Identity-H '
+        b'/DescendantFonts [4 0 R] /ToUnicode 5 0 R >>',
+        b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /SimSun '
+        b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+        b'/FontDescriptor 6 0 R /DW 1000 /W [32 126 500] /CIDToGIDMap /Identity >>',
+        b'<< /Length %d >>\nstream\n' % len(to_unicode) + to_unicode + b'\nendstream',
+        b'<< /Type /FontDescriptor /FontName /SimSun /Flags 4 /FontBBox [0 -141 1000 859] '
+        b'/ItalicAngle 0 /Ascent 859 /Descent -141 /CapHeight 700 /StemV 80 >>',
+    ]
+    kids = []
+    for page_lines in pages:
+        operations = ['BT /F1 10 Tf 40 800 Td 15 TL']
+        for line in page_lines:
+            operations.append('<' + ''.join(f'{ord(char):04X}' for char in line) + '> Tj T*')
+        operations.append('ET')
+        content = '\n'.join(operations).encode('ascii')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+WRITERS = {'txt': to_txt, 'docx': to_docx, 'pdf': to_pdf}
+
+
+def _timed(timings, name, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0) + time.perf_counter() - start
+    return wrapper
+
+
+def instrumented_parser(timings, pdf_workers=1):
+    """ResumeParser whose stages add their wall time (seconds) to timings"""
+    parser = ResumeParser(pdf_workers=pdf_workers)
+    for name in dir(parser):
+        if name.startswith('_extract_') and name != '_extract_resume':
+            setattr(parser, name, _timed(timings, name, getattr(parser, name)))
+
+    extract_resume = parser._extract_resume
+
+    def segmented_extract(sections=None):
+        # Segmenting happens on first use; time it apart from the first extractor
+        _timed(timings, '_sections', parser._sections)()
+        return extract_resume(sections)
+
+    parser._extract_resume = segmented_extract
+    return parser
+
+
+def check_accuracy(resume_data, truth):
+    """Per-field match of parsed data against the ground truth"""
+    info = resume_data.get('personal_info', {})
+    checks = {field: info.get(field) == truth[field] for field in ACCURACY_FIELDS if field != 'skills'}
+    checks['skills'] = sorted(resume_data.get('skills', [])) == truth['skills']
+    return checks
+
+
+def run_case(locale, fmt, pages, repeat=REPEAT, pdf_workers=1):
+    """Benchmark one corpus document; stage times are medians in milliseconds"""
+    lines, truth = make_resume(locale, pages)
+    data = WRITERS[fmt](lines)
+    filename = f'resume.{fmt}'
+
+    runs = []
+    resume_data = None
+    with tempfile.TemporaryDirectory() as folder:
+        for attempt in range(repeat):
+            timings = {}
+            start = time.perf_counter()
+            resume_data = instrumented_parser(timings, pdf_workers).parse(data, filename)
+            timings['parse'] = time.perf_counter() - start
+            # A fresh store each time, so generate() renders instead of reusing a file
+            generator = ResumeGenerator(OutputStore(os.path.join(folder, str(attempt))))
+            _timed(timings, 'ResumeGenerator.generate', generator.generate)(resume_data, filename)
+            runs.append(timings)
+
+        # Memory is measured in a separate run: tracing slows everything down
+        tracemalloc.start()
+        try:
+            ResumeParser(pdf_workers=pdf_workers).parse(data, filename)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    stages = {name: round(statistics.median(run.get(name, 0) for run in runs) * 1000, 3)
+              for name in runs[0]}
+    accuracy = check_accuracy(resume_data, truth)
+    return {
+        'locale': locale,
+        'format': fmt,
+        'pages': pages,
+        'bytes': len(data),
+        'stages_ms': stages,
+        'peak_memory_kb': round(peak / 1024, 1),
+        'accuracy': accuracy,
+        'accuracy_score': round(sum(accuracy.values()) / len(accuracy), 3),
+    }
+
+
+def run_benchmark(locales=LOCALES, formats=FORMATS, page_sizes=PAGE_SIZES, repeat=REPEAT, pdf_workers=1,
+                  progress=None):
+    """Run every (locale, format, pages) case and return the report dict"""
+    # Compile the parser rules and build the DOCX template outside the measurements
+    ResumeParser().parse(b'warm up', 'warm_up.txt')
+    new_document()
+
+    results = []
+    for locale in locales:
+        for fmt in formats:
+            for pages in page_sizes:
+                result = run_case(locale, fmt, pages, repeat=repeat, pdf_workers=pdf_workers)
+                results.append(result)
+                if progress:
+                    progress(result)
+    return {
+        'meta': {
+            'parser_version': PARSER_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'pdf_workers': pdf_workers,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'results': results,
+        'accuracy_score': round(statistics.mean(result['accuracy_score'] for result in results), 3) if results else None,
+    }
+
+
+def _case_key(result):
+    return result['locale'], result['format'], result['pages']
+
+
+def compare(report, baseline, threshold=THRESHOLD):
+    """List regressions of report against baseline: slower stages and lost accuracy"""
+    previous = {_case_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+        case = '{}/{}/{}p'.format(*_case_key(result))
+        for stage, ms in result['stages_ms'].items():
+            old_ms = old['stages_ms'].get(stage)
+            if old_ms is not None and ms - old_ms > max(old_ms * threshold, MIN_REGRESSION_MS):
+                regressions.append(f'{case} {stage}: {old_ms:.1f} -> {ms:.1f} ms (+{(ms / old_ms - 1) * 100 if old_ms else 0:.0f}%)')
+        for field, ok in result['accuracy'].items():
+            if old['accuracy'].get(field) and not ok:
+                regressions.append(f'{case} accuracy: {field} no longer matches the ground truth')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Benchmark ResumeParser on a synthetic corpus.')
+    parser.add_argument('-o', '--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='earlier report to compare against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='allowed slowdown per stage (0.2 = 20%%)')
+    parser.add_argument('--locales', default=','.join(LOCALES), help='comma-separated: en,zh')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='comma-separated: txt,docx,pdf')
+    parser.add_argument('--pages', default=','.join(map(str, PAGE_SIZES)), help='comma-separated page counts')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='runs per case; the median is reported')
+    parser.add_argument('--pdf-workers', type=int, default=1, help='PDF extraction processes (1 = in process)')
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print('{locale:>2} {format:<4} {pages:>3}p  parse {parse:>9.1f} ms  generate {generate:>7.1f} ms  '
+              'peak {peak_memory_kb:>8.0f} KB  accuracy {accuracy_score:.2f}'.format(
+                  parse=result['stages_ms']['parse'], generate=result['stages_ms']['ResumeGenerator.generate'],
+                  **result), file=sys.stderr)
+
+    report = run_benchmark(
+        locales=args.locales.split(','),
+        formats=args.formats.split(','),
+        page_sizes=[int(pages) for pages in args.pages.split(',')],
+        repeat=max(1, args.repeat),
+        pdf_workers=args.pdf_workers,
+        progress=progress
+    )
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['regressions'] = compare(report, json.load(f), args.threshold)
+        for line in report['regressions']:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        status = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
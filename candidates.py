@@ -0,0 +1,286 @@
+import heapq
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from keywords import vocabulary_index, job_keywords, text_fields
+from parser_rules import get_rules
+from metrics import span
+from resume_model import Resume, StaleFormat
+
+# Parsed resumes kept for ranking against job descriptions. They hold contact
+# details, so they are kept in memory only unless CANDIDATE_DB names a SQLite
+# file (e.g. cache/candidates.sqlite). Either way, candidates are dropped
+# CANDIDATE_MAX_AGE seconds (default 7 days) after they were added; 0 keeps
+# them until deleted.
+CANDIDATE_DB = os.getenv('CANDIDATE_DB', '')
+CANDIDATE_MAX_AGE = int(os.getenv('CANDIDATE_MAX_AGE', 7 * 24 * 3600))
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Occurrences in these fields count this many extra times, on top of the full text
+FIELD_BOOSTS = {'skills': 2.0, 'titles': 1.0}
+
+
+def candidate_terms(resume_data, rules=None):
+    """({term: boosted frequency}, document length) for one resume"""
+    index = vocabulary_index(rules or get_rules())
+    terms = {}
+    length = 0
+    for text in text_fields(resume_data):
+        for key, _ in index.scan(text):
+            terms[key] = terms.get(key, 0) + 1
+            length += 1
+
+    titles = [job.get('position', '') for job in resume_data.get('work_experience') or [] if isinstance(job, dict)]
+    for field, values in (('skills', resume_data.get('skills') or []), ('titles', titles)):
+        boost = FIELD_BOOSTS[field]
+        for text in text_fields(values):
+            for key, _ in index.scan(text):
+                terms[key] = terms.get(key, 0) + boost
+    return terms, length
+
+
+def _summary(doc_id, resume_data):
+    info = resume_data.get('personal_info') or {}
+    return {'document_id': doc_id, 'name': info.get('name', ''), 'email': info.get('email', '')}
+
+
+class CandidateStore:
+    """Parsed resumes with an in-memory inverted index for BM25 ranking.
+
+    Candidates are keyed by document_id, so re-adding the same resume is a
+    no-op. Each one is indexed when added; ranking only walks the postings
+    of the job description's keywords. In memory, resumes are kept in the
+    compact binary form of Resume. With a db_path, resumes (as resume_data
+    JSON, which any Python version reads back) and their term
+    frequencies are kept in SQLite and the index is rebuilt from the
+    stored frequencies (without re-tokenizing) on first use after a restart.
+    Candidates older than max_age seconds are dropped; delete() drops one.
+    """
+
+    def __init__(self, db_path=None, rules=None, max_age=CANDIDATE_MAX_AGE):
+        self.db_path = db_path
+        self.rules = rules
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._ids = {}  # document_id -> candidate number
+        self._summaries = []  # candidate number -> summary, None once dropped
+        self._lengths = []  # candidate number -> document length
+        self._added = []  # candidate number -> time added; numbers are in the order added
+        self._oldest = 0  # candidate numbers below this have expired
+        self._total_length = 0
+        self._postings = {}  # term -> {candidate number: boosted frequency}
+        self._norm_cache = None
+        self._resumes = {}  # document_id -> Resume bytes, without a database
+        self._conn = None
+        if db_path:
+            folder = os.path.dirname(db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS candidates ('
+                'id TEXT PRIMARY KEY, added REAL NOT NULL, summary TEXT NOT NULL, '
+                'resume_data TEXT NOT NULL, terms TEXT NOT NULL, length INTEGER NOT NULL)'
+            )
+            self._conn.commit()
+
+    def _load(self):
+        """Index the stored candidates; called with the lock held"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._conn is None:
+            return
+        for doc_id, added, summary, terms, length in self._conn.execute(
+                'SELECT id, added, summary, terms, length FROM candidates ORDER BY rowid'):
+            self._index(doc_id, added, json.loads(summary), json.loads(terms), length)
+
+    def _index(self, doc_id, added, summary, terms, length):
+        number = len(self._summaries)
+        self._ids[doc_id] = number
+        self._summaries.append(summary)
+        self._lengths.append(length)
+        self._added.append(added)
+        self._total_length += length
+        self._norm_cache = None
+        postings = self._postings
+        for term, frequency in terms.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = {}
+            posting[number] = frequency
+
+    def _unindex(self, numbers):
+        """Drop candidates from the index; called with the lock held"""
+        for number in numbers:
+            del self._ids[self._summaries[number]['document_id']]
+            self._summaries[number] = None
+            self._total_length -= self._lengths[number]
+        numbers = set(numbers)
+        for term, posting in list(self._postings.items()):
+            for number in numbers.intersection(posting):
+                del posting[number]
+            if not posting:
+                del self._postings[term]
+        self._norm_cache = None
+
+    def _expire(self):
+        """Drop candidates older than max_age; called with the lock held"""
+        if not self.max_age:
+            return
+        cutoff = time.time() - self.max_age
+        expired = []
+        while self._oldest < len(self._added) and self._added[self._oldest] < cutoff:
+            if self._summaries[self._oldest] is not None:
+                expired.append(self._oldest)
+            self._oldest += 1
+        if not expired:
+            return
+        if self._conn is not None:
+            self._conn.execute('DELETE FROM candidates WHERE added < ?', (cutoff,))
+            self._conn.commit()
+        for number in expired:
+            self._resumes.pop(self._summaries[number]['document_id'], None)
+        self._unindex(expired)
+
+    def add(self, doc_id, resume_data):
+        """Index a parsed resume; returns False if it was already stored"""
+        with self._lock:
+            self._load()
+            self._expire()
+            if doc_id in self._ids:
+                return False
+        terms, length = candidate_terms(resume_data, self.rules)
+        summary = _summary(doc_id, resume_data)
+        resume = Resume.from_dict(resume_data)
+        with self._lock:
+            if doc_id in self._ids:
+                return False
+            added = time.time()
+            if self._conn is not None:
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO candidates (id, added, summary, resume_data, terms, length) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (doc_id, added, json.dumps(summary, ensure_ascii=False),
+                     json.dumps(resume.to_dict(), ensure_ascii=False), json.dumps(terms, ensure_ascii=False), length)
+                )
+                self._conn.commit()
+            else:
+                self._resumes[doc_id] = resume.to_bytes()
+            self._index(doc_id, added, summary, terms, length)
+        return True
+
+    def delete(self, doc_id):
+        """Drop a candidate and its stored resume; returns False if it was not stored"""
+        with self._lock:
+            self._load()
+            number = self._ids.get(doc_id)
+            if number is None:
+                return False
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM candidates WHERE id = ?', (doc_id,))
+                self._conn.commit()
+            self._resumes.pop(doc_id, None)
+            self._unindex([number])
+        return True
+
+    def get(self, doc_id):
+        """Stored resume_data of a candidate, or None"""
+        with self._lock:
+            self._load()
+            self._expire()
+            if self._conn is None:
+                stored = self._resumes.get(doc_id)
+            else:
+                row = self._conn.execute('SELECT resume_data FROM candidates WHERE id = ?', (doc_id,)).fetchone()
+                stored = row[0] if row else None
+        if stored is None:
+            return None
+        if isinstance(stored, str):
+            return json.loads(stored)
+        try:
+            return Resume.from_bytes(stored).to_dict()
+        except StaleFormat:
+            return None  # stored as bytes by an earlier version, under another Python
+
+    @span
+    def rank(self, job_desc, top_k=20, include_email=False):
+        """Best top_k candidates for a job description by BM25 score.
+
+        Returns summaries (document_id and name, and email with include_email)
+        with 'score' and the 'matched' keywords, best first.
+        Keywords are scored heaviest first; once the ones left cannot lift a
+        candidate into the top_k, only candidates already close enough are
+        scored further (MaxScore pruning, which keeps the ranking exact).
+        """
+        keywords = job_keywords(job_desc, rules=self.rules)
+        with self._lock:
+            self._load()
+            self._expire()
+            count = len(self._ids)
+            if not count or not keywords or top_k < 1:
+                return []
+            norms = self._norms()
+            query = []  # (upper bound of the term's contribution, term, posting)
+            for term, weight in keywords:
+                posting = self._postings.get(term)
+                if posting:
+                    idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    # frequency / (frequency + norm) < 1, so this factor bounds each contribution
+                    query.append((weight * idf * (BM25_K1 + 1), term, posting))
+            query.sort(key=lambda item: -item[0])
+
+            scores = {}
+            remaining = sum(factor for factor, _, _ in query)
+            pruned = False
+            for factor, term, posting in query:
+                # Clamped: float drift must not make the bound negative and prune a tie with the threshold
+                remaining = max(0.0, remaining - factor)
+                if pruned:
+                    for number, score in scores.items():
+                        frequency = posting.get(number)
+                        if frequency:
+                            scores[number] = score + factor * frequency / (frequency + norms[number])
+                    continue
+                get = scores.get
+                for number, frequency in posting.items():
+                    scores[number] = get(number, 0.0) + factor * frequency / (frequency + norms[number])
+                if len(scores) > top_k:
+                    threshold = heapq.nlargest(top_k, scores.values())[-1]
+                    if remaining < threshold:
+                        scores = {number: score for number, score in scores.items()
+                                  if score >= threshold or score + remaining >= threshold}
+                        pruned = True
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            results = []
+            for number, score in best:
+                result = dict(self._summaries[number])
+                if not include_email:
+                    del result['email']
+                result['score'] = round(score, 4)
+                result['matched'] = [term for _, term, posting in query if number in posting]
+                results.append(result)
+            return results
+
+    def _norms(self):
+        """BM25 length normalization k1 * (1 - b + b * length / average) per candidate, cached until the next change"""
+        if self._norm_cache is None:
+            average = self._total_length / len(self._ids) or 1.0
+            k1, b = BM25_K1, BM25_B
+            self._norm_cache = [k1 * (1 - b + b * length / average) for length in self._lengths]
+        return self._norm_cache
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            self._expire()
+            return len(self._ids)
@@ -0,0 +1,224 @@
+import re
+
+# Contact details are read from the first CONTACT_HEADER_CHARS characters. Email,
+# profile and website links that are not in the header are looked up in the rest of
+# the text, by substring search, for at most CONTACT_FALLBACK_HITS candidate positions.
+CONTACT_HEADER_CHARS = 1000
+CONTACT_FALLBACK_HITS = 100
+MAX_TOKEN_CHARS = 256  # longer tokens are never contact details
+
+# No pattern below ever runs over more than one token of at most MAX_TOKEN_CHARS,
+# and tokens and phone candidates are cut with single character-class runs, which
+# cannot backtrack. Extraction time is therefore linear in the input.
+TOKEN_SEPARATORS = re.compile(r'[\s|｜,;，；、：<>\[\]()"\']+')
+PHONE_CANDIDATE = re.compile(r'(?<![0-9A-Za-z])[+(]?[0-9][0-9()\-. \t]*')
+EMAIL = re.compile(r'[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,24}')
+WEBSITE = re.compile(r'(?:https?://|www\.)[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,24}(?:[/?#]\S*)?', re.IGNORECASE)
+PROFILE_ID = re.compile(r'[\w\-]+')
+
+EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+EMAIL_DOMAIN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-')
+TRAILING_PUNCTUATION = '.,;:!?)]}>\'"。，；：！？'
+
+# Profile sites: site -> (marker before the profile id, canonical URL prefix)
+PROFILES = {
+    'linkedin': ('linkedin.com/in/', 'https://linkedin.com/in/'),
+    'github': ('github.com/', 'https://github.com/'),
+}
+PROFILE_MARKERS = {site: re.compile(re.escape(marker), re.IGNORECASE) for site, (marker, _) in PROFILES.items()}
+LINK_MARKERS = ('http', 'www.')
+
+DIGITS = frozenset('0123456789')
+
+
+def normalize_phone(candidate, phone_formats):
+    """E.164 form ('+8613812345678') of a phone number candidate, or '' if it is not valid.
+
+    Numbers written with '+' or '00' carry their country code. Others must
+    fully match one of phone_formats, tuples of (country code, compiled
+    national pattern, trunk prefix) tried in order; the trunk prefix is
+    dropped from the national number.
+    """
+    candidate = candidate.strip()
+    digits = ''.join(char for char in candidate if char in DIGITS)
+    if candidate.startswith('+') or candidate.startswith('00'):
+        if not candidate.startswith('+'):
+            digits = digits[2:]
+        # E.164: up to 15 digits, and country codes never start with 0
+        return '+' + digits if 8 <= len(digits) <= 15 and digits[0] != '0' else ''
+    if len(digits) > 15:
+        return ''
+    for country_code, pattern, trunk in phone_formats:
+        if pattern.fullmatch(digits):
+            if trunk and digits.startswith(trunk):
+                digits = digits[len(trunk):]
+            return f'+{country_code}{digits}'
+    return ''
+
+
+def normalize_email(email):
+    """Email with its (case-insensitive) domain lowercased"""
+    local, _, domain = email.rpartition('@')
+    return f'{local}@{domain.lower()}'
+
+
+def normalize_url(url):
+    """URL with a lowercase scheme and host, no 'www.', and no trailing punctuation or slash"""
+    url = url.rstrip(TRAILING_PUNCTUATION)
+    scheme, separator, rest = url.partition('://')
+    if not separator:
+        scheme, rest = 'https', url
+    host, _, path = rest.partition('/')
+    host = host.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = path.rstrip('/')
+    return f"{scheme.lower()}://{host}" + (f'/{path}' if path else '')
+
+
+def profile_url(token, site):
+    """Canonical profile URL if the token links to a profile on site, else ''"""
+    marker = PROFILE_MARKERS[site].search(token)
+    if not marker:
+        return ''
+    profile_id = PROFILE_ID.match(token, marker.end())
+    return PROFILES[site][1] + profile_id.group() if profile_id else ''
+
+
+def website_url(token):
+    """Normalized URL of the first website link in token, unless it is a profile site, else ''"""
+    website = WEBSITE.search(token)
+    if not website:
+        return ''
+    url = normalize_url(website.group())
+    host = url.partition('://')[2].split('/', 1)[0]
+    if any(host == site + '.com' or host.endswith('.' + site + '.com') for site in PROFILES):
+        return ''
+    return url
+
+
+def _token_at(text, position):
+    """The whitespace-delimited token around position, at most MAX_TOKEN_CHARS each way"""
+    start = position
+    limit = max(0, position - MAX_TOKEN_CHARS)
+    while start > limit and not text[start - 1].isspace():
+        start -= 1
+    end = position
+    limit = min(len(text), position + MAX_TOKEN_CHARS)
+    while end < limit and not text[end].isspace():
+        end += 1
+    return text[start:end]
+
+
+def _scan_email(text):
+    """First email anywhere in text, checking at most CONTACT_FALLBACK_HITS '@' signs"""
+    position = text.find('@')
+    for _ in range(CONTACT_FALLBACK_HITS):
+        if position < 0:
+            break
+        start = position
+        while start > 0 and position - start < 64 and text[start - 1] in EMAIL_LOCAL_CHARS:
+            start -= 1
+        end = position + 1
+        while end < len(text) and end - position < 255 and text[end] in EMAIL_DOMAIN_CHARS:
+            end += 1
+        # A sentence may end right after the address
+        while end > position + 1 and text[end - 1] in '.-':
+            end -= 1
+        email = EMAIL.fullmatch(text, start, end)
+        if email:
+            return normalize_email(email.group())
+        position = text.find('@', position + 1)
+    return ''
+
+
+def _finder(text):
+    """find(marker, start): position in text of a lowercase marker, ignoring case, or -1"""
+    # 'İ' lowercases to two characters; as 'i' the markers (all ASCII) are found the same
+    text_lower = text.replace('\u0130', 'i').lower()
+    if len(text_lower) == len(text):
+        # Every character lowercased to one character, so positions in text_lower index text
+        return text_lower.find
+    # Some other character did not, so search text itself, ignoring case
+    patterns = {}
+
+    def find(marker, start):
+        pattern = patterns.get(marker)
+        if pattern is None:
+            pattern = patterns[marker] = re.compile(re.escape(marker), re.IGNORECASE)
+        match = pattern.search(text, start)
+        return match.start() if match else -1
+    return find
+
+
+def _scan(text, find, markers, read):
+    """First non-empty read(token) for the tokens at the markers, checking at most CONTACT_FALLBACK_HITS"""
+    def next_position(start):
+        positions = [position for position in (find(marker, start) for marker in markers) if position >= 0]
+        return min(positions) if positions else -1
+
+    position = next_position(0)
+    for _ in range(CONTACT_FALLBACK_HITS):
+        if position < 0:
+            break
+        value = read(_token_at(text, position))
+        if value:
+            return value
+        position = next_position(position + 1)
+    return ''
+
+
+def _scan_profile(text, find, site):
+    """First profile link for site anywhere in text"""
+    return _scan(text, find, (PROFILES[site][0],), lambda token: profile_url(token, site))
+
+
+def _scan_website(text, find):
+    """First website link anywhere in text"""
+    return _scan(text, find, LINK_MARKERS, website_url)
+
+
+def extract_contacts(text, rules):
+    """Return email, phone (E.164), linkedin, github and website found in text"""
+    header = text[:CONTACT_HEADER_CHARS]
+    contacts = {'email': '', 'phone': '', 'linkedin': '', 'github': '', 'website': ''}
+
+    for token in TOKEN_SEPARATORS.split(header):
+        if not token or len(token) > MAX_TOKEN_CHARS:
+            continue
+        if '@' in token:
+            if not contacts['email']:
+                email = EMAIL.search(token)
+                if email:
+                    contacts['email'] = normalize_email(email.group())
+            continue
+        if '.' not in token:
+            continue
+        for site in PROFILES:
+            if not contacts[site]:
+                contacts[site] = profile_url(token, site)
+        if not contacts['website']:
+            contacts['website'] = website_url(token)
+
+    # Formats of locales whose script appears in the header are tried first,
+    # so an 11-digit Chinese mobile number is not read as a US number
+    preferred = [fmt for script, *fmt in rules.phone_formats if script is not None and script.search(header)]
+    phone_formats = preferred + [fmt for script, *fmt in rules.phone_formats if fmt not in preferred]
+    for candidate in PHONE_CANDIDATE.finditer(header):
+        phone = normalize_phone(candidate.group(), phone_formats)
+        if phone:
+            contacts['phone'] = phone
+            break
+
+    # Contact details outside the header are rare; look for them without tokenizing the text
+    if len(text) > len(header):
+        if not contacts['email']:
+            contacts['email'] = _scan_email(text)
+        if not contacts['linkedin'] or not contacts['github'] or not contacts['website']:
+            find = _finder(text)
+            for site in PROFILES:
+                if not contacts[site]:
+                    contacts[site] = _scan_profile(text, find, site)
+            if not contacts['website']:
+                contacts['website'] = _scan_website(text, find)
+    return contacts
@@ -0,0 +1,373 @@
+import hashlib
+import html
+import json
+import re
+
+from resume_model import Resume
+
+# Every export of one resume_data shares a document id, so a file name like
+# resume_template_<id>.html can be rendered on demand from the stored data.
+EXPORT_PREFIX = 'resume_template_'
+
+_YEAR_MONTH = re.compile(r'((?:19|20)\d{2})(?:[./-](0?[1-9]|1[0-2])\b)?')
+_PERIOD_SEPARATOR = re.compile(r'\s*(?:-|–|—|~|\bto\b|至)\s*', re.IGNORECASE)
+
+
+def document_id(resume_data):
+    """Stable id for resume_data (or its Resume), shared by all of its export formats"""
+    if isinstance(resume_data, Resume):
+        resume_data = resume_data.to_dict()
+    payload = json.dumps(resume_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def export_name(doc_id, fmt):
+    return f"{EXPORT_PREFIX}{doc_id}.{get_exporter(fmt).extension}"
+
+
+def parse_export_name(name):
+    """Return (document id, format) for an export file name, or None"""
+    stem, _, extension = name.rpartition('.')
+    if not stem.startswith(EXPORT_PREFIX):
+        return None
+    exporter = EXTENSIONS.get(extension.lower())
+    if exporter is None:
+        return None
+    return stem[len(EXPORT_PREFIX):], exporter.name
+
+
+def resume_blocks(resume_data):
+    """Yield (kind, text) blocks of resume_data or a Resume, in the order and grouping of every export.
+
+    kind is one of name, contact, section, body, heading, detail, meta,
+    bullet, item and break (an empty line); resume_generator.py gives each
+    one a paragraph style (BLOCK_STYLES), and every exporter lays a resume out
+    from these blocks, so all formats agree.
+    """
+    personal_info = resume_data.get('personal_info', {})
+    if personal_info.get('name'):
+        yield 'name', personal_info['name']
+    contact_info = [personal_info[field] for field in ('email', 'phone', 'address', 'linkedin', 'github', 'website')
+                    if personal_info.get(field)]
+    if contact_info:
+        yield 'contact', ' | '.join(contact_info)
+    yield 'break', ''
+
+    if resume_data.get('summary'):
+        yield 'section', 'Professional Summary'
+        yield 'body', resume_data['summary']
+
+    if resume_data.get('work_experience'):
+        yield 'section', 'Work Experience'
+        for exp in resume_data['work_experience']:
+            header_text = []
+            if exp.get('position'):
+                header_text.append(exp['position'])
+            if exp.get('company'):
+                header_text.append(f"at {exp['company']}")
+            if header_text:
+                yield 'heading', ' | '.join(header_text)
+            period_location = [exp[field] for field in ('period', 'location') if exp.get(field)]
+            if period_location:
+                yield 'meta', ' | '.join(period_location)
+            if isinstance(exp.get('description'), list):
+                for desc in exp['description']:
+                    if desc:
+                        yield 'bullet', desc
+            elif exp.get('description'):
+                yield 'body', exp['description']
+            yield 'break', ''
+
+    if resume_data.get('education'):
+        yield 'section', 'Education'
+        for edu in resume_data['education']:
+            header_text = []
+            if edu.get('degree'):
+                header_text.append(edu['degree'])
+            if edu.get('major'):
+                header_text.append(f"in {edu['major']}")
+            if header_text:
+                yield 'heading', ' | '.join(header_text)
+            if edu.get('institution'):
+                yield 'detail', edu['institution']
+            details = []
+            if edu.get('period'):
+                details.append(edu['period'])
+            if edu.get('gpa'):
+                details.append(f"GPA: {edu['gpa']}")
+            if details:
+                yield 'meta', ' | '.join(details)
+            yield 'break', ''
+
+    if resume_data.get('skills'):
+        yield 'section', 'Skills'
+        yield 'body', ', '.join(resume_data['skills'])
+
+    if resume_data.get('projects'):
+        yield 'section', 'Projects'
+        for project in resume_data['projects']:
+            if project.get('name'):
+                yield 'heading', project['name']
+            if project.get('description'):
+                yield 'body', project['description']
+            if project.get('technologies'):
+                yield 'meta', f"Technologies: {', '.join(project['technologies'])}"
+            yield 'break', ''
+
+    if resume_data.get('certifications'):
+        yield 'section', 'Certifications'
+        for cert in resume_data['certifications']:
+            cert_text = []
+            if cert.get('name'):
+                cert_text.append(cert['name'])
+            if cert.get('issuer'):
+                cert_text.append(f"({cert['issuer']})")
+            if cert.get('date'):
+                cert_text.append(f"- {cert['date']}")
+            if cert_text:
+                yield 'item', ' '.join(cert_text)
+
+    if resume_data.get('languages'):
+        yield 'section', 'Languages'
+        yield 'body', ', '.join(resume_data['languages'])
+
+    if resume_data.get('awards'):
+        yield 'section', 'Awards & Honors'
+        for award in resume_data['awards']:
+            award_text = []
+            if award.get('name'):
+                award_text.append(award['name'])
+            if award.get('date'):
+                award_text.append(f"({award['date']})")
+            if award_text:
+                yield 'item', ' - '.join(award_text)
+
+
+class Exporter:
+    """Turns resume_data (or a Resume) into one output format.
+
+    Subclasses set name, extension and mimetype and implement export(),
+    which returns the file contents as bytes. Register them with
+    register_exporter() to make them available to the API.
+    """
+    name = None
+    extension = None
+    mimetype = 'application/octet-stream'
+    # Sent as a download rather than shown in the browser
+    attachment = True
+
+    def export(self, resume_data):
+        raise NotImplementedError
+
+
+class HTMLExporter(Exporter):
+    """Standalone HTML page for in-browser previews"""
+    name = 'html'
+    extension = 'html'
+    mimetype = 'text/html'
+    attachment = False
+
+    STYLE = (
+        "body{font-family:'Microsoft YaHei',Arial,sans-serif;font-size:11pt;max-width:50em;margin:2em auto;color:#222}"
+        "h1{font-size:18pt;text-align:center;margin:0}"
+        ".contact{font-size:10pt;text-align:center}"
+        "h2{font-size:12pt;color:#003366;margin:12pt 0 6pt}"
+        "h3{font-size:11pt;margin:0}"
+        "p{margin:0 0 6pt}.detail,.meta{font-size:10pt;margin:0}.meta{font-style:italic}"
+        "ul{margin:0 0 6pt}.item{margin:0 0 3pt}"
+    )
+
+    def export(self, resume_data):
+        personal_info = resume_data.get('personal_info', {})
+        title = html.escape(personal_info.get('name') or 'Resume')
+        parts = [f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>'
+                 f'<style>{self.STYLE}</style></head><body>']
+        in_list = False
+        for kind, text in resume_blocks(resume_data):
+            if kind == 'bullet' and not in_list:
+                parts.append('<ul>')
+                in_list = True
+            elif kind != 'bullet' and in_list:
+                parts.append('</ul>')
+                in_list = False
+            text = html.escape(text)
+            if kind == 'name':
+                parts.append(f'<h1>{text}</h1>')
+            elif kind == 'contact':
+                parts.append(f'<p class="contact">{text}</p>')
+            elif kind == 'section':
+                parts.append(f'<h2>{text.upper()}</h2>')
+            elif kind == 'heading':
+                parts.append(f'<h3>{text}</h3>')
+            elif kind == 'bullet':
+                parts.append(f'<li>{text}</li>')
+            elif kind != 'break':
+                parts.append(f'<p class="{kind}">{text}</p>')
+        if in_list:
+            parts.append('</ul>')
+        parts.append('</body></html>\n')
+        return '\n'.join(parts).encode('utf-8')
+
+
+class MarkdownExporter(Exporter):
+    """Markdown text, e.g. for pasting into other tools"""
+    name = 'markdown'
+    extension = 'md'
+    mimetype = 'text/markdown'
+    attachment = False
+
+    # Characters that would otherwise start Markdown formatting
+    _SPECIAL = re.compile(r'([\\`*_\[\]#<>|])')
+
+    def export(self, resume_data):
+        lines = []
+        for kind, text in resume_blocks(resume_data):
+            text = self._SPECIAL.sub(r'\\\1', text)
+            if kind == 'name':
+                lines.append(f'# {text}')
+            elif kind == 'section':
+                lines += ['', f'## {text.upper()}']
+            elif kind == 'heading':
+                lines += ['', f'**{text}**']
+            elif kind in ('meta', 'detail'):
+                lines.append(f'*{text}*' if kind == 'meta' else text)
+            elif kind in ('bullet', 'item'):
+                lines.append(f'- {text}')
+            elif kind != 'break':
+                lines.append(text)
+        return ('\n'.join(lines).strip() + '\n').encode('utf-8')
+
+
+def _split_period(period):
+    """Map a period like 'Jan 2019 - Present' or '2018.09-2022.06' to JSON Resume dates"""
+    parts = _PERIOD_SEPARATOR.split(period.strip(), maxsplit=1)
+    dates = []
+    for part in parts:
+        match = _YEAR_MONTH.search(part)
+        if match is None:
+            dates.append('')
+        elif match.group(2):
+            dates.append(f'{match.group(1)}-{int(match.group(2)):02d}')
+        else:
+            dates.append(match.group(1))
+    start = dates[0] if dates else ''
+    end = dates[1] if len(dates) > 1 else ''
+    return start, end
+
+
+def _dated(entry, period):
+    start, end = _split_period(period or '')
+    if start:
+        entry['startDate'] = start
+    if end:
+        entry['endDate'] = end
+    return entry
+
+
+class JSONResumeExporter(Exporter):
+    """JSON Resume (https://jsonresume.org/schema) document"""
+    name = 'json'
+    extension = 'json'
+    mimetype = 'application/json'
+    attachment = False
+
+    def export(self, resume_data):
+        return json.dumps(self.convert(resume_data), ensure_ascii=False, indent=2).encode('utf-8')
+
+    def convert(self, resume_data):
+        """resume_data as a JSON Resume dict; empty fields are left out"""
+        personal_info = resume_data.get('personal_info', {})
+        basics = {field: personal_info[field] for field in ('name', 'email', 'phone') if personal_info.get(field)}
+        if personal_info.get('website'):
+            basics['url'] = personal_info['website']
+        if resume_data.get('summary'):
+            basics['summary'] = resume_data['summary']
+        if personal_info.get('address'):
+            basics['location'] = {'address': personal_info['address']}
+        profiles = [{'network': network, 'url': personal_info[field]}
+                    for field, network in (('linkedin', 'LinkedIn'), ('github', 'GitHub')) if personal_info.get(field)]
+        if profiles:
+            basics['profiles'] = profiles
+
+        work = []
+        for exp in resume_data.get('work_experience', []):
+            entry = {field: exp[field] for field in ('position', 'location') if exp.get(field)}
+            if exp.get('company'):
+                entry['name'] = exp['company']
+            description = exp.get('description')
+            if isinstance(description, list):
+                if any(description):
+                    entry['highlights'] = [desc for desc in description if desc]
+            elif description:
+                entry['summary'] = description
+            work.append(_dated(entry, exp.get('period')))
+
+        education = []
+        for edu in resume_data.get('education', []):
+            entry = {}
+            if edu.get('institution'):
+                entry['institution'] = edu['institution']
+            if edu.get('major'):
+                entry['area'] = edu['major']
+            if edu.get('degree'):
+                entry['studyType'] = edu['degree']
+            if edu.get('gpa'):
+                entry['score'] = edu['gpa']
+            education.append(_dated(entry, edu.get('period')))
+
+        projects = []
+        for project in resume_data.get('projects', []):
+            entry = {field: project[field] for field in ('name', 'description') if project.get(field)}
+            if project.get('technologies'):
+                entry['keywords'] = list(project['technologies'])
+            projects.append(_dated(entry, project.get('period')))
+
+        document = {
+            '$schema': 'https://raw.githubusercontent.com/jsonresume/resume-schema/v1.0.0/schema.json',
+            'basics': basics,
+            'work': work,
+            'education': education,
+            'skills': [{'name': skill} for skill in resume_data.get('skills', [])],
+            'projects': projects,
+            'certificates': [{field: cert[field] for field in ('name', 'issuer', 'date') if cert.get(field)}
+                             for cert in resume_data.get('certifications', [])],
+            'languages': [{'language': language} for language in resume_data.get('languages', [])],
+            'awards': [{'title': award['name'], **({'date': award['date']} if award.get('date') else {})}
+                       for award in resume_data.get('awards', []) if award.get('name')],
+        }
+        return document
+
+
+class DOCXExporter(Exporter):
+    """Word document from the styled template; the slow format, so render it lazily"""
+    name = 'docx'
+    extension = 'docx'
+    mimetype = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+    def export(self, resume_data):
+        # python-docx is only loaded once someone asks for a document
+        from resume_generator import ResumeGenerator
+        return ResumeGenerator().render(resume_data)
+
+
+EXPORTERS = {}  # format name -> exporter
+EXTENSIONS = {}  # file extension -> exporter
+
+
+def register_exporter(exporter):
+    """Make an Exporter instance available by its format name and file extension"""
+    EXPORTERS[exporter.name] = exporter
+    EXTENSIONS[exporter.extension] = exporter
+    return exporter
+
+
+def get_exporter(fmt):
+    """Exporter for a format name or file extension; raises ValueError if unknown"""
+    exporter = EXPORTERS.get(fmt) or EXTENSIONS.get(fmt)
+    if exporter is None:
+        raise ValueError(f"Unknown export format '{fmt}'. Available: {', '.join(sorted(EXPORTERS))}")
+    return exporter
+
+
+for _exporter in (DOCXExporter(), HTMLExporter(), MarkdownExporter(), JSONResumeExporter()):
+    register_exporter(_exporter)
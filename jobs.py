@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds its maximum number of jobs"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once its job has been cancelled"""
+
+
+class MemoryJobStore:
+    """Keep job records in a dict; they are lost when the process exits"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job):
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def purge(self, finished_before):
+        """Delete finished jobs older than the given timestamp"""
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['status'] in FINISHED and (job['finished'] or 0) < finished_before]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Keep job records in a SQLite file, so results survive restarts"""
+
+    COLUMNS = ('id', 'status', 'created', 'started', 'finished', 'result', 'error')
+
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, '
+            'started REAL, finished REAL, result TEXT, error TEXT)'
+        )
+        # Jobs that were queued or running when the process stopped will never finish
+        self._conn.execute(
+            'UPDATE jobs SET status = ?, error = ?, finished = ? WHERE status IN (?, ?)',
+            (FAILED, 'Interrupted by server restart', time.time(), QUEUED, RUNNING)
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def create(self, job):
+        self._write('INSERT INTO jobs (id, status, created, started, finished, result, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [self._encode(name, job.get(name)) for name in self.COLUMNS])
+
+    def update(self, job_id, **fields):
+        names = [name for name in fields if name in self.COLUMNS and name != 'id']
+        if not names:
+            return
+        self._write(f"UPDATE jobs SET {', '.join(name + ' = ?' for name in names)} WHERE id = ?",
+                    [self._encode(name, fields[name]) for name in names] + [job_id])
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        if job['result'] is not None:
+            job['result'] = json.loads(job['result'])
+        return job
+
+    def purge(self, finished_before):
+        self._write(f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished < ?",
+                    list(FINISHED) + [finished_before])
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    @staticmethod
+    def _encode(name, value):
+        if name == 'result' and value is not None:
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+
+class JobQueue:
+    """Run jobs on a bounded local worker pool and record their state in a store.
+
+    handler(payload, is_cancelled) does the work and returns a JSON-serializable
+    result; it should call is_cancelled() between steps and raise JobCancelled
+    when it returns True. At most max_pending jobs may be queued or running at
+    once; submit() raises QueueFull beyond that.
+    """
+
+    def __init__(self, handler, store=None, workers=4, max_pending=32, ttl=3600):
+        self.handler = handler
+        self.store = store or MemoryJobStore()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._active = {}  # job_id -> (future, cancel event)
+
+    def submit(self, payload):
+        """Queue a job and return its id"""
+        self.store.purge(time.time() - self.ttl)
+        job_id = uuid.uuid4().hex
+        cancel = threading.Event()
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                raise QueueFull(f'{self.max_pending} jobs already pending')
+            self.store.create({'id': job_id, 'status': QUEUED, 'created': time.time(),
+                               'started': None, 'finished': None, 'result': None, 'error': None})
+            future = self._executor.submit(self._run, job_id, payload, cancel)
+            self._active[job_id] = (future, cancel)
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished"""
+        with self._lock:
+            active = self._active.get(job_id)
+        if active is None:
+            return False
+        future, cancel = active
+        cancel.set()
+        if future.cancel():
+            # Never started, so _run will not clean up after it
+            self._finish(job_id, CANCELLED)
+        return True
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._active)
+        return {'pending': pending, 'max_pending': self.max_pending, 'workers': self.workers}
+
+    def _run(self, job_id, payload, cancel):
+        if cancel.is_set():
+            self._finish(job_id, CANCELLED)
+            return
+        self.store.update(job_id, status=RUNNING, started=time.time())
+        try:
+            result = self.handler(payload, cancel.is_set)
+        except JobCancelled:
+            self._finish(job_id, CANCELLED)
+        except Exception as e:
+            self._finish(job_id, FAILED, error=str(e))
+        else:
+            if cancel.is_set():
+                self._finish(job_id, CANCELLED)
+            else:
+                self._finish(job_id, DONE, result=result)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self.store.update(job_id, status=status, finished=time.time(), result=result, error=error)
+        with self._lock:
+            self._active.pop(job_id, None)
@@ -0,0 +1,221 @@
+import re
+from functools import lru_cache
+
+from parser_rules import get_rules
+from metrics import span
+
+# Local keyword gap analysis: which job description keywords the resume covers.
+# Runs in well under a millisecond for typical inputs and needs no network, so it
+# answers even when the LLM is slow or unavailable.
+MAX_NGRAM = 3  # longest vocabulary phrase, in words
+BM25_K1 = 1.2  # term frequency saturation: repeats in the job description count less and less
+SKILL_WEIGHT = 3.0  # vocabulary skills weigh this much more than other job description terms
+MIN_TERM_COUNT = 2  # other terms must occur this often in the job description to count
+MAX_KEYWORDS = 30  # heaviest job description keywords scored
+
+# Lowercase words, keeping the punctuation of names like c++, c#, node.js, asp.net and .net
+# (a leading dot is dropped again by VocabularyIndex.scan unless the word is a skill)
+TOKEN = re.compile(r'\.?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*|[\u4e00-\u9fff]+')
+
+# Skills known in addition to the locales' common_skills
+SKILLS = (
+    'c', 'c++', 'c#', 'go', 'rust', 'ruby', 'php', 'swift', 'kotlin', 'scala', 'perl', 'bash', 'matlab',
+    'rails', 'laravel', 'fastapi', '.net', 'asp.net', 'next.js', 'graphql', 'rest api', 'grpc',
+    'redis', 'kafka', 'rabbitmq', 'elasticsearch', 'spark', 'hadoop', 'airflow', 'snowflake',
+    'oracle', 'sqlite', 'dynamodb', 'cassandra', 'azure', 'gcp', 'terraform', 'ansible', 'jenkins',
+    'ci/cd', 'github actions', 'microservices', 'serverless', 'nginx', 'unix',
+    'machine learning', 'deep learning', 'natural language processing', 'computer vision',
+    'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'pandas', 'numpy', 'data analysis',
+    'data visualization', 'statistics', 'tableau', 'power bi', 'excel', 'etl', 'llm',
+    'unit testing', 'test automation', 'selenium', 'agile', 'scrum', 'jira', 'figma',
+    'project management', 'product management', 'stakeholder management', 'leadership',
+    'communication', 'mentoring', 'seo', 'salesforce', 'sap',
+)
+
+# Other spellings -> vocabulary skill
+ALIASES = {
+    'js': 'javascript', 'ts': 'typescript', 'nodejs': 'node', 'node.js': 'node', 'reactjs': 'react',
+    'react.js': 'react', 'vue.js': 'vue', 'vuejs': 'vue', 'angularjs': 'angular', 'golang': 'go',
+    'postgres': 'postgresql', 'k8s': 'kubernetes', 'amazon web services': 'aws',
+    'google cloud': 'gcp', 'google cloud platform': 'gcp', 'microsoft azure': 'azure',
+    'ml': 'machine learning', 'dl': 'deep learning', 'nlp': 'natural language processing',
+    'cv': 'computer vision', 'sklearn': 'scikit-learn', 'continuous integration': 'ci/cd',
+    'restful api': 'rest api', 'restful': 'rest api', 'powerbi': 'power bi', 'ror': 'rails',
+    'ruby on rails': 'rails', 'dotnet': '.net', 'elastic search': 'elasticsearch',
+    'large language models': 'llm', 'large language model': 'llm',
+    # Chinese
+    '机器学习': 'machine learning', '深度学习': 'deep learning', '自然语言处理': 'natural language processing',
+    '计算机视觉': 'computer vision', '数据分析': 'data analysis', '数据可视化': 'data visualization',
+    '项目管理': 'project management', '产品管理': 'product management', '微服务': 'microservices',
+    '单元测试': 'unit testing', '自动化测试': 'test automation', '敏捷开发': 'agile', '大模型': 'llm',
+    '领导力': 'leadership', '沟通能力': 'communication', '统计学': 'statistics',
+}
+
+# Words that say nothing about fit, including boilerplate common to job descriptions
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+for from has have having he her his how i if in into is it its may more most must my no not of on
+one or other our out over own per same she should so some such than that the their them then there
+these they this those through to too under up upon us very via was we were what when where which while
+who whom why will with within without would you your yours etc e.g i.e
+ability able across apply applicant candidate candidates company core day degree duties environment
+excellent experience experienced familiarity familiar good great help ideal including join knowledge
+looking new opportunity plus position preferred related required requirement requirements
+responsibilities responsible role skill skills strong team teams understanding well work working
+year years
+""".split())
+
+
+def _stem(word):
+    """Plural to singular for plain words ('pipelines' -> 'pipeline')"""
+    if len(word) > 4 and word[-1] == 's' and word[-2] not in 'isu' and word.isalpha():
+        return word[:-1]
+    return word
+
+
+def _words(text):
+    """Normalized Latin words and runs of CJK characters"""
+    return [token if _is_cjk(token) else _stem(token) for token in TOKEN.findall(text.lower())]
+
+
+def _is_cjk(token):
+    return '\u4e00' <= token[0] <= '\u9fff'
+
+
+class VocabularyIndex:
+    """Skill phrases (as normalized words joined by spaces) mapped to their canonical skill"""
+
+    def __init__(self, skills, aliases):
+        self.phrases = {}
+        self.cjk_phrases = {}  # matched as substrings of CJK runs, which have no word breaks
+        for skill in skills:
+            self._add(skill, skill)
+        for alias, skill in aliases.items():
+            self._add(alias, skill)
+        self.max_words = max((len(phrase.split(' ')) for phrase in self.phrases), default=1)
+
+    def _add(self, term, skill):
+        if _is_cjk(term):
+            self.cjk_phrases[term] = skill
+        else:
+            self.phrases.setdefault(' '.join(_words(term)), skill)
+
+    def scan(self, text):
+        """Yield (key, is_skill) for every term occurrence in text.
+
+        Vocabulary phrases are matched longest first; the words they cover are
+        not counted again on their own.
+        """
+        words = _words(text)
+        phrases = self.phrases
+        longest = min(MAX_NGRAM, self.max_words)
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if word[0] == '.' and word not in phrases:
+                # Only skills like .net keep the dot; '...word' is word
+                word = words[i] = _stem(word[1:])
+            if _is_cjk(word):
+                for phrase, skill in self.cjk_phrases.items():
+                    for _ in range(word.count(phrase)):
+                        yield skill, True
+                i += 1
+                continue
+            for n in range(min(longest, len(words) - i), 0, -1):
+                skill = phrases.get(word if n == 1 else ' '.join(words[i:i + n]))
+                if skill is not None:
+                    yield skill, True
+                    i += n
+                    break
+            else:
+                if word not in STOPWORDS and len(word) > 1 and not word.isdigit():
+                    yield word, False
+                i += 1
+
+
+@lru_cache(maxsize=4)
+def vocabulary_index(rules):
+    """The VocabularyIndex for a RuleSet, built once"""
+    return VocabularyIndex(tuple(rules.common_skills) + SKILLS, ALIASES)
+
+
+def bm25_tf(count, k1=BM25_K1):
+    """BM25 term frequency saturation: 1 for one occurrence, approaching k1 + 1"""
+    return count * (k1 + 1) / (count + k1)
+
+
+def job_keywords(job_desc, idf=None, rules=None):
+    """[(keyword, weight)] for a job description, heaviest first.
+
+    Skills from the vocabulary always count; other words only when repeated.
+    idf optionally maps keywords to inverse document frequencies learned from
+    a corpus; without it every keyword has an idf of 1.
+    """
+    index = vocabulary_index(rules or get_rules())
+    counts = {}
+    skills = set()
+    for key, is_skill in index.scan(job_desc):
+        counts[key] = counts.get(key, 0) + 1
+        if is_skill:
+            skills.add(key)
+
+    keywords = []
+    for key, count in counts.items():
+        if key not in skills and count < MIN_TERM_COUNT:
+            continue
+        weight = bm25_tf(count) * (SKILL_WEIGHT if key in skills else 1.0)
+        if idf is not None:
+            weight *= idf.get(key, 1.0)
+        keywords.append((key, weight))
+    keywords.sort(key=lambda item: (-item[1], item[0]))
+    return keywords[:MAX_KEYWORDS]
+
+
+def resume_terms(resume_data, rules=None):
+    """Set of every keyword found in the resume's text fields"""
+    index = vocabulary_index(rules or get_rules())
+    return {key for text in text_fields(resume_data) for key, _ in index.scan(text)}
+
+
+def text_fields(value):
+    """Every string in a resume_data value, depth first"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from text_fields(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from text_fields(item)
+
+
+@span
+def keyword_gap(resume_data, job_desc, idf=None, rules=None):
+    """Weighted share of the job description's keywords found in the resume.
+
+    Returns {'score': 0-100, or None without keywords, 'matched': [...],
+    'missing': [...]}, keywords ordered by weight.
+    """
+    keywords = job_keywords(job_desc or '', idf, rules)
+    terms = resume_terms(resume_data, rules)
+    matched = [key for key, _ in keywords if key in terms]
+    missing = [key for key, _ in keywords if key not in terms]
+    total = sum(weight for _, weight in keywords)
+    covered = sum(weight for key, weight in keywords if key in terms)
+    return {
+        'score': round(100 * covered / total) if total else None,
+        'matched': matched,
+        'missing': missing,
+    }
+
+
+def format_gap(gap):
+    """Markdown section for a keyword_gap result, in the style of the LLM analysis"""
+    if gap['score'] is None:
+        return '**KEYWORD GAP ANALYSIS**\n- No keywords found in the job description.'
+    lines = ['**KEYWORD GAP ANALYSIS**', f"- Keyword match: {gap['score']}%"]
+    if gap['missing']:
+        lines.append('- Missing: ' + ', '.join(gap['missing']))
+    if gap['matched']:
+        lines.append('- Matched: ' + ', '.join(gap['matched']))
+    return '\n'.join(lines)
@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class Unavailable(RuntimeError):
+    """Raised instead of calling a service that is overloaded or failing"""
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adjusted by AIMD (additive increase, multiplicative decrease).
+
+    Each call that succeeds within latency_target while at least half the
+    limit is in use raises the limit by 1/limit, about one per round of
+    calls; a slower call or an overload error multiplies it by backoff.
+    Until the first such decrease, successes raise it by 1 instead (slow
+    start, doubling per round), so a cold start does not throttle a burst
+    for long.
+    Callers over the limit wait up to queue_timeout seconds for a slot,
+    then get Unavailable. Threads and asyncio tasks (acquire and
+    acquire_async) can share one limiter.
+    """
+
+    def __init__(self, name, initial=10, min_limit=1, max_limit=100, latency_target=20.0, backoff=0.9,
+                 queue_timeout=2.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.in_flight = 0
+        self.slow_start = True
+        self.admitted = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+        self._async_waiters = deque()  # (loop, future) of acquire_async calls waiting for a slot
+
+    def _try_acquire(self):
+        """Take a slot if one is free; called with the lock held"""
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        return False
+
+    def _reject(self):
+        self.rejected += 1
+        return Unavailable(f'{self.name} concurrency limit reached ({int(self.limit)} calls in flight); '
+                           'try again shortly')
+
+    def acquire(self):
+        """Wait for a slot, raising Unavailable after queue_timeout"""
+        with self._cond:
+            if not self._cond.wait_for(self._try_acquire, self.queue_timeout):
+                raise self._reject()
+
+    async def acquire_async(self):
+        """acquire for asyncio code, waiting without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise self._reject()
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                pass  # one last try above
+            finally:
+                with self._cond:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def release(self, latency=None, overloaded=False):
+        """Free a slot, adjusting the limit by the call's outcome.
+
+        latency is the duration in seconds of a successful call; overloaded
+        marks an overload error. Calls with neither leave the limit as is.
+        """
+        with self._cond:
+            if overloaded or (latency is not None and latency > self.latency_target):
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.slow_start = False
+            elif latency is not None and self.in_flight * 2 >= self.limit:
+                # Only a limit in use is known to be safe to raise
+                self.limit = min(self.max_limit, self.limit + (1 if self.slow_start else 1 / self.limit))
+            self.in_flight -= 1
+            free = max(1, int(self.limit) - self.in_flight)  # more than one if the limit went up
+            self._cond.notify(free)
+            waiters = [self._async_waiters.popleft() for _ in range(min(free, len(self._async_waiters)))]
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': round(self.limit, 2),
+                'slow_start': self.slow_start,
+                'in_flight': self.in_flight,
+                'waiting': len(self._async_waiters),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+            }
+
+
+class CircuitBreaker:
+    """Stops calls to a failing service for a while.
+
+    Closed, calls pass through, and failure_threshold failures in a row
+    open it. Open, calls get Unavailable until reset_timeout seconds have
+    passed; then one trial call is let through (half open), and its
+    success closes the breaker while its failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0  # in a row
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial = False  # a half-open trial call is running
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise Unavailable unless a call may go ahead now; returns whether it is the half-open trial"""
+        with self._lock:
+            if self.state == 'open':
+                wait = self._opened_at + self.reset_timeout - time.monotonic()
+                if wait > 0:
+                    self.rejected += 1
+                    raise Unavailable(f'{self.name} circuit breaker open after repeated failures; '
+                                      f'retry in {wait:.0f}s')
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self._trial:
+                    self.rejected += 1
+                    raise Unavailable(f'{self.name} circuit breaker half open; a trial call is in progress')
+                self._trial = True
+                return True
+            return False
+
+    def after_call(self, failed, trial=False):
+        """Record a call's outcome: failed True or False, or None for one that says nothing about the service.
+
+        trial is what before_call returned for the call.
+        """
+        with self._lock:
+            if trial:
+                self._trial = False
+            if failed is None:
+                return
+            if not failed:
+                self.failures = 0
+                self.state = 'closed'
+                return
+            self.failures += 1
+            if self.state != 'open' and (trial or self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened += 1
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+            }
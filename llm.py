@@ -1,54 +1,700 @@
 import os
+import re
+import json
+import time
+import asyncio
+import random
+import hashlib
+import threading
+from collections import deque
 from dotenv import load_dotenv
-from openai import OpenAI
+import openai
+from openai import OpenAI, AsyncOpenAI
+
+try:
+    import httpx
+except ImportError:  # newer openai releases ship the httpx2 fork instead
+    import httpx2 as httpx
+
+from cache import TieredCache, SingleFlight
+from limits import AdaptiveLimiter, CircuitBreaker, Unavailable
+from exporters import resume_blocks
+from keywords import vocabulary_index
+from parser_rules import get_rules
+from metrics import span
 
 # 1. Load the variables from the .env file
 load_dotenv("api.env")
 
-def analyze_resume(resume_text, job_desc):
-    api_key = os.getenv("PERPLEXITY_API")
-    if not api_key:
-        raise ValueError("API Key not found! Ensure PERPLEXITY_API is set in your api.env file.")
+MODEL = "sonar-pro"
+BASE_URL = os.getenv("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+SYSTEM_PROMPT = "You are a professional ATS resume optimizer. Use Markdown for formatting. Bold all section headers."
+PROMPT_TEMPLATE = """Analyze the following resume against the job description.
+
+RESUME:
+{resume}
+
+JOB DESCRIPTION:
+{job_description}
+
+Structure your response using these exact headers in BOLD:
+**KEYWORD GAP ANALYSIS**
+(List missing keywords here)
+
+**EXPERIENCE & SKILL GAPS**
+(List missing experience or certifications)
+
+**ACTIONABLE RECOMMENDATIONS**
+(List 3-4 specific ways to improve this resume)
+
+Keep it short, professional, and use bullet points."""
+NO_JOB_DESCRIPTION = "No specific job description provided. Provide a general professional critique."
+
+# Prompt size budget, in tokens estimated locally (see estimate_tokens). Long resumes
+# and job descriptions are trimmed to fit, least important parts first.
+LLM_PROMPT_BUDGET = int(os.getenv("LLM_PROMPT_BUDGET", 3000))
+LLM_JD_BUDGET = int(os.getenv("LLM_JD_BUDGET", 1000))  # at most this much of it for the job description
+MIN_LINE_TOKENS = 16  # a resume line cut to fit keeps at least this much of its start
+# Resume sections by title (as in exporters.resume_blocks), most important first
+SECTION_PRIORITY = ('Work Experience', 'Skills', 'Professional Summary', 'Projects', 'Education',
+                    'Certifications', 'Languages', 'Awards & Honors')
+# Job description sentences that say nothing about the role: EEO statements, benefits, company blurbs
+JD_BOILERPLATE = re.compile(
+    r'equal (?:employment )?opportunity|\beeo\b|without regard to|veteran status|reasonable accommodation'
+    r'|benefits|401\(?k\)?|paid time off|\bpto\b|health insurance|perks|about us|who we are|how to apply'
+    r'|apply now|privacy (?:policy|notice)|五险一金|福利|关于我们|公司简介|简历请投递',
+    re.IGNORECASE
+)
+SENTENCE_BREAK = re.compile(r'(?<=[.!?;])\s+|(?<=[。！？；])|\n')
+CJK = re.compile(r'[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]')
+
+# Response cache: identical (model, prompt, resume, job description) reuse an earlier answer.
+# Set LLM_CACHE_DB to an empty string to keep the cache in memory only.
+LLM_CACHE_SIZE = 512  # entries kept in memory
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 24 * 3600))  # seconds
+LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024  # on-disk tier
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join("cache", "llm_cache.sqlite"))
+
+response_cache = TieredCache(
+    max_entries=LLM_CACHE_SIZE,
+    max_age=LLM_CACHE_TTL,
+    db_path=LLM_CACHE_DB or None,
+    max_bytes=LLM_CACHE_MAX_BYTES
+)
+_in_flight = SingleFlight()
+
+# Connection pool and retry settings for the shared client
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 20))  # max open connections
+LLM_ASYNC_POOL_SIZE = int(os.getenv("LLM_ASYNC_POOL_SIZE", 256))  # async serving mode (asgi.py)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))  # seconds per attempt
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_BASE = 0.5  # seconds, doubled per retry
+LLM_BACKOFF_MAX = 8.0
+
+# Errors worth retrying: network trouble, timeouts, rate limits and 5xx
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# Overload protection (see limits.py). Calls over the adaptive concurrency limit wait up to
+# LLM_QUEUE_TIMEOUT seconds; after LLM_BREAKER_FAILURES calls in a row fail with one of the
+# errors above, no call is made for LLM_BREAKER_RESET seconds. Refused calls raise Unavailable.
+LLM_LIMIT_INITIAL = int(os.getenv("LLM_LIMIT_INITIAL", 10))  # concurrent calls, adapted between 1 and the pool size
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", 20))  # seconds; slower calls lower the limit
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 2))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", 30))
+
+# One breaker for the sync and async clients: they call the same service
+llm_breaker = CircuitBreaker('LLM', LLM_BREAKER_FAILURES, LLM_BREAKER_RESET)
+
+
+class LLMClient:
+    """Long-lived, thread-safe OpenAI-compatible client with pooled connections.
+
+    One instance is shared by every request so HTTP keep-alive connections and
+    TLS sessions are reused. Retries use exponential backoff with full jitter,
+    and latency/error counters are kept for the health endpoint. Each call
+    passes the circuit breaker and the adaptive concurrency limiter first.
+    """
+
+    client_class = OpenAI
+    http_client_class = openai.DefaultHttpxClient
+
+    def __init__(self, base_url=BASE_URL, pool_size=LLM_POOL_SIZE, timeout=LLM_TIMEOUT,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX, breaker=None):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else llm_breaker
+        self.limiter = AdaptiveLimiter('LLM', LLM_LIMIT_INITIAL, max_limit=pool_size,
+                                       latency_target=LLM_LATENCY_TARGET, queue_timeout=LLM_QUEUE_TIMEOUT)
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)  # seconds, successful calls only
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.errors = {}  # exception class name -> count
+
+    def _get_client(self):
+        """Create the underlying client on first use"""
+        with self._lock:
+            if self._client is None:
+                api_key = os.getenv("PERPLEXITY_API")
+                if not api_key:
+                    raise ValueError("API Key not found! Ensure PERPLEXITY_API is set in your api.env file.")
+                http_client = self.http_client_class(
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size),
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+                )
+                # Retries are handled here so they can be counted and jittered
+                self._client = self.client_class(
+                    api_key=api_key,
+                    base_url=self.base_url,
+                    http_client=http_client,
+                    max_retries=0
+                )
+            return self._client
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _create(self, **kwargs):
+        """Call chat.completions.create, retrying retryable errors"""
+        attempt = 0
+        while True:
+            try:
+                # Inside the try, so a missing API key is counted like any other error
+                return self._get_client().chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                self._record_error(e)
+                if attempt >= self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+            except Exception as e:
+                self._record_error(e)
+                raise
+
+    def _admit(self):
+        """Pass the breaker and wait for a slot; returns whether this is the breaker's trial call"""
+        trial = self.breaker.before_call()
+        try:
+            self.limiter.acquire()
+        except Unavailable:
+            self.breaker.after_call(None, trial)
+            raise
+        return trial
+
+    def _finish(self, trial, start, error=None):
+        """Free the call's slot and tell the breaker and limiter how it went"""
+        if error is None:
+            self.limiter.release(latency=time.perf_counter() - start)
+            self.breaker.after_call(False, trial)
+        elif isinstance(error, RETRYABLE_ERRORS):
+            self.limiter.release(overloaded=True)
+            self.breaker.after_call(True, trial)
+        else:
+            # Bad requests, cancellations and abandoned streams say nothing about the service
+            self.limiter.release()
+            self.breaker.after_call(None, trial)
+
+    def chat(self, messages, model=MODEL, **kwargs):
+        """Run a chat completion with retries and return the response"""
+        trial = self._admit()
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            response = self._create(model=model, messages=messages, **kwargs)
+            self._record_latency(time.perf_counter() - start)
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._finish(trial, start, error)
+
+    def chat_stream(self, messages, model=MODEL, **kwargs):
+        """Run a streaming chat completion and yield content as it arrives.
+
+        Retries only happen before the first chunk; a stream that breaks
+        midway raises to the caller.
+        """
+        trial = self._admit()
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            stream = self._create(model=model, messages=messages, stream=True, **kwargs)
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                self._record_error(e)
+                raise
+            self._record_latency(time.perf_counter() - start)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._finish(trial, start, error)
+
+    def _record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _record_error(self, error):
+        name = type(error).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def metrics(self):
+        """Snapshot of in-flight count, latency percentiles and error counts"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot = {
+                'in_flight': self.in_flight,
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': dict(self.errors),
+                'pool_size': self.pool_size,
+            }
+        snapshot['limiter'] = self.limiter.stats()
+        snapshot['breaker'] = self.breaker.stats()
+        snapshot['latency_p50'] = _percentile(latencies, 0.50)
+        snapshot['latency_p95'] = _percentile(latencies, 0.95)
+        return snapshot
+
+
+class AsyncLLMClient(LLMClient):
+    """LLMClient for asyncio code: awaits AsyncOpenAI instead of blocking a thread.
+
+    Retry policy and counters are the same as LLMClient's. An instance must
+    only be used from one event loop, since its connections belong to it.
+    """
+
+    client_class = AsyncOpenAI
+    http_client_class = openai.DefaultAsyncHttpxClient
+
+    def __init__(self, pool_size=LLM_ASYNC_POOL_SIZE, **kwargs):
+        super().__init__(pool_size=pool_size, **kwargs)
+
+    async def _create(self, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                # Inside the try, so a missing API key is counted like any other error
+                return await self._get_client().chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                self._record_error(e)
+                if attempt >= self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+            except Exception as e:
+                self._record_error(e)
+                raise
+
+    async def _admit(self):
+        trial = self.breaker.before_call()
+        try:
+            await self.limiter.acquire_async()
+        except BaseException:
+            self.breaker.after_call(None, trial)
+            raise
+        return trial
+
+    async def chat(self, messages, model=MODEL, **kwargs):
+        trial = await self._admit()
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            response = await self._create(model=model, messages=messages, **kwargs)
+            self._record_latency(time.perf_counter() - start)
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._finish(trial, start, error)
+
+    async def aclose(self):
+        """Close the pooled connections"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    async def chat_stream(self, messages, model=MODEL, **kwargs):
+        trial = await self._admit()
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            stream = await self._create(model=model, messages=messages, stream=True, **kwargs)
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                self._record_error(e)
+                raise
+            self._record_latency(time.perf_counter() - start)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._finish(trial, start, error)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide LLMClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
+
+
+def get_async_client():
+    """Return the process-wide AsyncLLMClient of the serving event loop"""
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncLLMClient()
+        return _async_client
+
+
+def _normalize(text):
+    """Collapse whitespace so cosmetic differences share a cache entry"""
+    return ' '.join(text.split())
 
-    client = OpenAI(
-        api_key=api_key,
-        base_url="https://api.perplexity.ai"
-    )
 
+def cache_key(model, system_prompt, prompt_text):
+    """Hash of everything that determines the analysis"""
+    parts = [model, _normalize(system_prompt), _normalize(prompt_text)]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def estimate_tokens(text):
+    """Rough token count without a tokenizer: one per CJK character, one per 4 other characters"""
+    cjk = len(CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _truncate(text, budget):
+    """Longest prefix of text estimated at no more than budget tokens"""
+    if estimate_tokens(text) <= budget:
+        return text
+    cost = 0.0
+    for end, char in enumerate(text):
+        cost += 1 if CJK.match(char) else 0.25
+        if cost > budget:
+            return text[:end]
+    return text
+
+
+def _deduplicated(resume_data):
+    """resume_data with repeated skills and languages (ignoring case) removed"""
+    resume_data = dict(resume_data)
+    for field in ('skills', 'languages'):
+        items = resume_data.get(field)
+        if isinstance(items, list):
+            seen = set()
+            resume_data[field] = [item for item in items
+                                  if item.lower() not in seen and not seen.add(item.lower())]
+    return resume_data
+
+
+def render_resume(resume_data, budget):
+    """Compact text of resume_data within budget tokens, and the titles of the sections cut to fit.
+
+    Contact details (not needed for the analysis), empty fields and repeated
+    lines are left out. Sections are filled in SECTION_PRIORITY order and
+    the text keeps the resume's own order.
+    """
+    sections = []  # (title, lines), the first line being the title
+    seen = set()
+    for kind, text in resume_blocks(_deduplicated(resume_data)):
+        if kind in ('name', 'contact', 'break'):
+            continue
+        text = ' '.join(text.split())
+        if kind == 'section':
+            sections.append((text, [f'# {text}']))
+        elif text and sections:
+            if kind in ('body', 'bullet', 'item'):
+                # Headings and dates may repeat between entries; descriptions say nothing new
+                if text.lower() in seen:
+                    continue
+                seen.add(text.lower())
+            sections[-1][1].append(f'- {text}' if kind in ('bullet', 'item') else text)
+
+    priority = {title: rank for rank, title in enumerate(SECTION_PRIORITY)}
+    remaining = budget
+    kept = {}
+    trimmed = []
+    for title, lines in sorted(sections, key=lambda section: priority.get(section[0], len(priority))):
+        fitted = []
+        cost = 0
+        for line in lines:
+            line_cost = estimate_tokens(line) + 1  # and its newline
+            if cost + line_cost > remaining:
+                # Keep the start of a long line if there is room for some of it
+                if remaining - cost >= MIN_LINE_TOKENS:
+                    fitted.append(_truncate(line, remaining - cost - 2) + '…')
+                    cost = remaining
+                break
+            fitted.append(line)
+            cost += line_cost
+        if len(fitted) < len(lines):
+            trimmed.append(title)
+        if len(fitted) > 1:  # more than the title
+            kept[title] = fitted
+            remaining -= cost
+    return '\n'.join(line for title, _ in sections if title in kept for line in kept[title]), trimmed
+
+
+def compact_job_description(job_desc, budget):
+    """job_desc without boilerplate or repeated sentences, within budget tokens; also returns how many
+    sentences were dropped.
+
+    When the rest is still too long, the sentences naming the most known
+    skills are kept, in their original order.
+    """
+    sentences = []
+    seen = set()
+    dropped = 0
+    for sentence in SENTENCE_BREAK.split(job_desc):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        if sentence.lower() in seen or JD_BOILERPLATE.search(sentence):
+            dropped += 1
+            continue
+        seen.add(sentence.lower())
+        sentences.append(sentence)
+
+    costs = [estimate_tokens(sentence) + 1 for sentence in sentences]
+    if sum(costs) <= budget:
+        return '\n'.join(sentences), dropped
+
+    index = vocabulary_index(get_rules())
+    skills = [sum(1 for _, is_skill in index.scan(sentence) if is_skill) for sentence in sentences]
+    keep = set()
+    remaining = budget
+    for i in sorted(range(len(sentences)), key=lambda i: (-skills[i], i)):
+        if costs[i] <= remaining:
+            keep.add(i)
+            remaining -= costs[i]
+    if not keep:
+        # One run-on sentence longer than the budget
+        return _truncate(sentences[0], budget), dropped + len(sentences) - 1
+    return '\n'.join(sentence for i, sentence in enumerate(sentences) if i in keep), dropped + len(sentences) - len(keep)
+
+
+class Prompt:
+    """User prompt of one analysis, with its cache key and size report"""
+
+    def __init__(self, text, report):
+        self.text = text
+        self.report = report
+        self.key = cache_key(MODEL, SYSTEM_PROMPT, text)
+
+
+def build_prompt(resume, job_desc, budget=None):
+    """Compact Prompt for a resume (resume_data, or text such as its JSON) and a job description.
+
+    The job description gets at most LLM_JD_BUDGET tokens and half of the
+    budget; the resume gets what is left of budget (LLM_PROMPT_BUDGET).
+    """
+    budget = LLM_PROMPT_BUDGET if budget is None else budget
+    if isinstance(resume, str):
+        try:
+            resume = json.loads(resume)
+        except ValueError:
+            pass
+
+    fixed = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(PROMPT_TEMPLATE.format(resume='', job_description=''))
+    available = max(0, budget - fixed)
+    jd_text, jd_dropped = compact_job_description(job_desc or '', min(LLM_JD_BUDGET, available // 2))
     # Use a default message if job_desc is empty
-    jd_content = job_desc if job_desc.strip() else "No specific job description provided. Provide a general professional critique."
-
-    # Updated prompt with explicit BOLD instructions
-    prompt = f"""
-    Analyze the following resume against the job description.
-    
-    RESUME:
-    {resume_text}
-    
-    JOB DESCRIPTION:
-    {jd_content}
-    
-    Structure your response using these exact headers in BOLD:
-    **KEYWORD GAP ANALYSIS**
-    (List missing keywords here)
-
-    **EXPERIENCE & SKILL GAPS**
-    (List missing experience or certifications)
-
-    **ACTIONABLE RECOMMENDATIONS**
-    (List 3-4 specific ways to improve this resume)
-
-    Keep it short, professional, and use bullet points.
+    jd_text = jd_text or NO_JOB_DESCRIPTION
+    jd_tokens = estimate_tokens(jd_text)
+
+    if isinstance(resume, dict):
+        resume_text, trimmed = render_resume(resume, available - jd_tokens)
+    else:
+        text = ' '.join(str(resume).split())
+        resume_text = _truncate(text, available - jd_tokens)
+        trimmed = [] if resume_text == text else ['resume']
+
+    text = PROMPT_TEMPLATE.format(resume=resume_text, job_description=jd_text)
+    return Prompt(text, {
+        'tokens': estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(text),
+        'budget': budget,
+        'resume_tokens': estimate_tokens(resume_text),
+        'job_description_tokens': jd_tokens,
+        'trimmed_sections': trimmed,
+        'job_description_sentences_dropped': jd_dropped,
+    })
+
+
+@span
+def analyze_prompt(prompt):
+    """LLM analysis of a Prompt, cached by its key"""
+    cached = response_cache.get(prompt.key)
+    if cached is not None:
+        return cached
+
+    # Concurrent identical requests wait for a single API call
+    return _in_flight.do(prompt.key, lambda: _complete_and_cache(prompt.key, prompt.text))
+
+
+def analyze_resume(resume, job_desc):
+    """Analysis of a resume (resume_data, or text such as its JSON) against a job description"""
+    return analyze_prompt(build_prompt(resume, job_desc))
+
+
+def analyze_prompt_stream(prompt):
+    """Yield the analysis of a Prompt in pieces as the model produces it.
+
+    A cached analysis is yielded in one piece. Streams are not coalesced
+    like analyze_prompt calls, but the finished text is cached for both.
     """
-    
-    response = client.chat.completions.create(
-        model="sonar-pro",
-        messages=[
-            {
-                "role": "system", 
-                "content": "You are a professional ATS resume optimizer. Use Markdown for formatting. Bold all section headers."
-            },
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response.choices[0].message.content
\ No newline at end of file
+    cached = response_cache.get(prompt.key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    for text in get_client().chat_stream(_messages(prompt.text)):
+        parts.append(text)
+        yield text
+    response_cache.put(prompt.key, ''.join(parts))
+
+
+def analyze_resume_stream(resume, job_desc):
+    """analyze_resume, streamed like analyze_prompt_stream"""
+    yield from analyze_prompt_stream(build_prompt(resume, job_desc))
+
+
+# Analyses in progress in the serving event loop: cache key -> Future
+_async_in_flight = {}
+
+
+@span
+async def analyze_prompt_async(prompt):
+    """analyze_prompt for asyncio code; concurrent identical calls share one API call"""
+    key = prompt.key
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    future = _async_in_flight.get(key)
+    if future is not None:
+        # shield: a follower going away must not cancel the leader's call
+        return await asyncio.shield(future)
+
+    future = _async_in_flight[key] = asyncio.get_running_loop().create_future()
+    try:
+        response = await get_async_client().chat(_messages(prompt.text))
+        analysis = response.choices[0].message.content
+        response_cache.put(key, analysis)
+        future.set_result(analysis)
+        return analysis
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # retrieved here, so no warning when nobody else waits
+        raise
+    finally:
+        del _async_in_flight[key]
+
+
+async def analyze_prompt_stream_async(prompt):
+    """analyze_prompt_stream for asyncio code"""
+    cached = response_cache.get(prompt.key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    async for text in get_async_client().chat_stream(_messages(prompt.text)):
+        parts.append(text)
+        yield text
+    response_cache.put(prompt.key, ''.join(parts))
+
+
+def _complete_and_cache(key, prompt):
+    # An identical call may have finished between our cache check and becoming leader
+    cached = response_cache.memory.get(key)
+    if cached is not None:
+        return cached
+
+    analysis = _complete(prompt)
+    response_cache.put(key, analysis)
+    return analysis
+
+
+def _messages(prompt):
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _complete(prompt):
+    response = get_client().chat(_messages(prompt))
+    return response.choices[0].message.content
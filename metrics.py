@@ -0,0 +1,183 @@
+import contextvars
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Timing spans around the hot path (parser stages, LLM analysis, document generation).
+# METRICS_ENABLED=0 leaves every decorated function unwrapped, so disabled spans cost nothing.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+# TIMING_LOG=1 logs one JSON line per request with its total time and span times
+TIMING_LOG = os.getenv('TIMING_LOG', '').lower() in ('1', 'true', 'yes')
+
+# Histogram bucket upper bounds in seconds, from regex passes to LLM calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+timing_log = logging.getLogger('jobsper.timing')
+if TIMING_LOG and not timing_log.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    timing_log.addHandler(_handler)
+    timing_log.setLevel(logging.INFO)
+    timing_log.propagate = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """Histograms and error counters keyed by metric name and label values"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}  # (metric, labels) -> Histogram
+        self._counters = {}  # (metric, labels) -> count
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, metric, help_text='', **labels):
+        """The Histogram for a metric and label values, created on first use"""
+        key = (metric, tuple(sorted((name, str(value)) for name, value in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+                self._help.setdefault(metric, help_text)
+            return histogram
+
+    def observe(self, metric, seconds, help_text='', **labels):
+        self.histogram(metric, help_text, **labels).observe(seconds)
+
+    def increment(self, metric, help_text='', **labels):
+        key = (metric, tuple(sorted((name, str(value)) for name, value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            self._help.setdefault(metric, help_text)
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            seen = set()
+            for (metric, labels), histogram in histograms:
+                if metric not in seen:
+                    seen.add(metric)
+                    lines += [f'# HELP {metric} {self._help[metric]}', f'# TYPE {metric} histogram']
+                counts, total, count = histogram.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f'{metric}_bucket{_labels(labels, le=le)} {cumulative}')
+                lines.append(f'{metric}_sum{_labels(labels)} {total!r}')
+                lines.append(f'{metric}_count{_labels(labels)} {count}')
+            for (metric, labels), count in counters:
+                if metric not in seen:
+                    seen.add(metric)
+                    lines += [f'# HELP {metric} {self._help[metric]}', f'# TYPE {metric} counter']
+                lines.append(f'{metric}{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+registry = Registry()
+
+# Span times (name -> seconds) of the request being handled, when TIMING_LOG is on
+_trace = contextvars.ContextVar('trace', default=None)
+
+
+def _span_histogram(name):
+    return registry.histogram('jobsper_span_duration_seconds', 'Time spent in instrumented functions', span=name)
+
+
+def observe_span(name, seconds, failed=False, histogram=None):
+    """Record one span in the histograms and the current request trace"""
+    (histogram or _span_histogram(name)).observe(seconds)
+    if failed:
+        registry.increment('jobsper_span_errors_total', 'Instrumented calls that raised', span=name)
+    trace = _trace.get()
+    if trace is not None:
+        trace[name] = trace.get(name, 0) + seconds
+
+
+def span(fn):
+    """Decorator timing every call of fn (or await, for coroutine functions) as a span named after its qualified name"""
+    if not METRICS_ENABLED:
+        return fn
+    name = fn.__qualname__
+    histogram = _span_histogram(name)  # looked up once, not per call
+
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                observe_span(name, time.perf_counter() - start, failed, histogram)
+
+        return async_wrapper
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            observe_span(name, time.perf_counter() - start, failed, histogram)
+
+    return wrapper
+
+
+def start_trace():
+    """Collect span times for the current request; returns a token for end_trace"""
+    return _trace.set({}) if TIMING_LOG else None
+
+
+def end_trace(token, **fields):
+    """Log the request's span times as one JSON line and stop collecting"""
+    if token is None:
+        return
+    trace = _trace.get()
+    _trace.reset(token)
+    fields['spans_ms'] = {name: round(seconds * 1000, 2) for name, seconds in trace.items()}
+    timing_log.info(json.dumps(fields, ensure_ascii=False))
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import time
+
+# Generated documents are kept for OUTPUT_MAX_AGE seconds and OUTPUT_MAX_BYTES in total;
+# the least recently used go first.
+OUTPUT_FOLDER = 'output'
+OUTPUT_MAX_AGE = int(os.getenv('OUTPUT_MAX_AGE', 24 * 3600))
+OUTPUT_MAX_BYTES = int(os.getenv('OUTPUT_MAX_BYTES', 512 * 1024 * 1024))
+OUTPUT_GC_INTERVAL = 60  # seconds between garbage collection passes
+
+
+class OutputStore:
+    """Content-addressed folder of generated files with age/size garbage collection.
+
+    Files are named by a content key, so the same input always maps to the
+    same file and different inputs never overwrite each other. Writes go to
+    a temp file first and are renamed into place, so readers never see a
+    partial file.
+    """
+
+    def __init__(self, folder=OUTPUT_FOLDER, max_age=OUTPUT_MAX_AGE, max_bytes=OUTPUT_MAX_BYTES,
+                 gc_interval=OUTPUT_GC_INTERVAL):
+        self.folder = folder
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.gc_interval = gc_interval
+        self._lock = threading.Lock()
+        self._last_gc = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def get(self, name):
+        """Path of a stored file, or None; marks it as recently used"""
+        path = self.path(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, name, data):
+        """Store bytes under name and return the path"""
+        path = self.path(name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.maybe_gc()
+        return path
+
+    def delete(self, name):
+        """Remove a stored file; returns False if there was none"""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def maybe_gc(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_gc < self.gc_interval:
+                return
+            self._last_gc = now
+        self.gc()
+
+    def gc(self):
+        """Delete expired files, then the least recently used until under max_bytes"""
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.folder):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            # Leftover temp files from interrupted writes count as expired after a minute
+            limit = 60 if entry.name.startswith('.tmp-') else self.max_age
+            if now - stat.st_mtime > limit:
+                self._remove(entry.path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_default_store():
+    """Process-wide store for the output/ folder"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = OutputStore()
+        return _default_store
@@ -0,0 +1,207 @@
+import re
+from bisect import bisect_right
+from types import MappingProxyType
+
+# Locale rule tables. Each locale contributes keywords and patterns; the
+# tables of all registered locales are merged (in registration order) and
+# compiled once into a RuleSet shared by every ResumeParser.
+LOCALES = {}
+
+
+def register_locale(name, section_keywords=None, degree_keywords=(), phone_formats=(), common_skills=(), script=None):
+    """Register (or replace) the rule tables for a locale
+
+    phone_formats are (country code, national number pattern, trunk prefix)
+    tuples; the pattern must match all digits of a number written without
+    a country code. script is a character class of the locale's writing
+    system; its phone formats are tried first when the header contains it.
+    """
+    global _rules
+    LOCALES[name] = {
+        'section_keywords': {section: tuple(keywords) for section, keywords in (section_keywords or {}).items()},
+        'degree_keywords': tuple(degree_keywords),
+        'phone_formats': tuple(tuple(phone_format) for phone_format in phone_formats),
+        'common_skills': tuple(common_skills),
+        'script': script,
+    }
+    _rules = None
+
+
+register_locale(
+    'en',
+    section_keywords={
+        'education': ['education', 'university', 'college', 'degree', 'bachelor', 'master', 'phd', 'diploma', 'school'],
+        'work_experience': ['experience', 'employment', 'work', 'position', 'job', 'career', 'company'],
+        'skills': ['skill', 'technical', 'proficiency', 'expertise', 'competence'],
+        'projects': ['project', 'portfolio', 'development'],
+        'certifications': ['certification', 'certificate', 'certified', 'license'],
+        'languages': ['language', 'languages', 'english', 'chinese', 'spanish', 'french', 'german'],
+        'awards': ['award', 'honor', 'achievement', 'recognition', 'prize'],
+        'summary': ['summary', 'objective', 'profile', 'about', 'introduction'],
+    },
+    degree_keywords=['bachelor', 'master', 'phd', 'doctor', 'associate', 'diploma'],
+    phone_formats=[
+        ('1', r'1?[2-9][0-9]{2}[2-9][0-9]{6}', '1'),  # North American: (415) 555-0132
+    ],
+    common_skills=['python', 'java', 'javascript', 'react', 'vue', 'angular',
+                   'node', 'sql', 'mongodb', 'docker', 'kubernetes', 'aws',
+                   'git', 'linux', 'html', 'css', 'typescript', 'spring',
+                   'django', 'flask', 'express', 'mysql', 'postgresql'],
+)
+
+register_locale(
+    'zh',
+    section_keywords={
+        'education': ['教育', '学历', '教育背景', '教育经历', '大学', '学院', '学校', '毕业', '学位', '本科', '硕士', '博士', '学士'],
+        'work_experience': ['工作', '工作经历', '工作经验', '工作履历', '职业经历', '任职', '就职', '公司', '职位', '岗位'],
+        'skills': ['技能', '专业技能', '技术技能', '能力', '专长', '技术', '掌握', '熟悉', '精通'],
+        'projects': ['项目', '项目经验', '项目经历', '作品', '开发', '项目作品'],
+        'certifications': ['证书', '认证', '资格证', '资质', '执照', '资格认证'],
+        'languages': ['语言', '语言能力', '外语', '英语', '中文', '普通话', '粤语'],
+        'awards': ['奖项', '荣誉', '奖励', '获奖', '成就', '表彰', '嘉奖'],
+        'summary': ['简介', '个人简介', '自我评价', '个人介绍', '概述', '个人概述', '职业目标'],
+    },
+    degree_keywords=['本科', '学士', '硕士', '博士', '专科', '研究生', '博士研究生', '硕士研究生'],
+    phone_formats=[
+        ('86', r'1[3-9][0-9]{9}', ''),  # Chinese mobile: 138xxxxxxxx
+        ('86', r'0[1-9][0-9]{8,10}', '0'),  # Chinese landline: 010-xxxxxxxx
+    ],
+    script=r'[\u4e00-\u9fff]',
+)
+
+
+class SectionIndex:
+    """Lines of a resume plus the sections each keyword line belongs to"""
+
+    def __init__(self, text, lines, lines_lower, hits):
+        self.text = text
+        self.lines = lines
+        self.lines_lower = lines_lower
+        self.hits = hits  # section -> sorted list of line numbers
+
+    def headers(self, section):
+        """Line numbers that contain one of the section's keywords"""
+        return self.hits.get(section, [])
+
+    def span(self, section):
+        """Line numbers from the section's first keyword line to the end of the text"""
+        headers = self.hits.get(section)
+        if not headers:
+            return range(0)
+        return range(headers[0], len(self.lines))
+
+
+def _trie_pattern(keywords):
+    """Build a regex alternation that shares common keyword prefixes"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional group, so the longest keyword wins
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class SectionSegmenter:
+    """Classify every line against all section keywords in a single pass.
+
+    All keywords are compiled into one prefix-trie regex that always matches
+    the longest keyword at a position. Shorter keywords starting at the same
+    position are prefixes of it, so their sections are folded into its entry.
+    """
+
+    def __init__(self, section_keywords):
+        sections = {}
+        for section, keywords in section_keywords.items():
+            for keyword in keywords:
+                sections.setdefault(keyword, set()).add(section)
+
+        self.sections = {}
+        for keyword in sections:
+            owners = set()
+            for other in sections:
+                if keyword.startswith(other):
+                    owners |= sections[other]
+            self.sections[keyword] = tuple(sorted(owners))
+
+        self.pattern = re.compile(_trie_pattern(sections))
+
+    def segment(self, text):
+        """Build a SectionIndex for text"""
+        lines = text.split('\n')
+        lines_lower = [line.lower() for line in lines]
+
+        # Offset of every line inside the joined lowercase text
+        starts = []
+        offset = 0
+        for line in lines_lower:
+            starts.append(offset)
+            offset += len(line) + 1
+
+        hits = {}
+        search = self.pattern.search
+        text_lower = '\n'.join(lines_lower)
+        match = search(text_lower)
+        while match:
+            line_no = bisect_right(starts, match.start()) - 1
+            for section in self.sections[match.group()]:
+                section_hits = hits.setdefault(section, [])
+                if not section_hits or section_hits[-1] != line_no:
+                    section_hits.append(line_no)
+            # Resume one character later so overlapping keywords are found too
+            match = search(text_lower, match.start() + 1)
+
+        return SectionIndex(text, lines, lines_lower, hits)
+
+
+class RuleSet:
+    """Compiled, read-only rules merged from a set of locales"""
+
+    # Locale-independent patterns (contact details are matched in contacts.py)
+    YEAR = re.compile(r'\d{4}')
+    LIST_SEPARATOR = re.compile(r'[,;|•\-\n]')
+    AT_IN_SEPARATOR = re.compile(r'\s+at\s+|\s+in\s+', re.IGNORECASE)
+    PIPE_SEPARATOR = re.compile(r'\s*\|\s*|｜')
+
+    def __init__(self, locales):
+        section_keywords = {}
+        degree_keywords = []
+        phone_formats = []
+        common_skills = []
+        for tables in locales:
+            for section, keywords in tables['section_keywords'].items():
+                section_keywords.setdefault(section, []).extend(keywords)
+            degree_keywords.extend(tables['degree_keywords'])
+            script = re.compile(tables['script']) if tables['script'] else None
+            phone_formats.extend((script, country_code, re.compile(pattern), trunk)
+                                 for country_code, pattern, trunk in tables['phone_formats'])
+            common_skills.extend(tables['common_skills'])
+
+        self.section_keywords = MappingProxyType(
+            {section: tuple(keywords) for section, keywords in section_keywords.items()}
+        )
+        self.segmenter = SectionSegmenter(self.section_keywords)
+        self.degree = re.compile('|'.join(re.escape(k) for k in degree_keywords)) if degree_keywords else None
+        # (script or None, country code, national pattern, trunk prefix)
+        self.phone_formats = tuple(phone_formats)
+        self.common_skills = tuple(common_skills)
+
+
+_rules = None
+
+
+def get_rules():
+    """Return the RuleSet for all registered locales, compiling it on first use"""
+    global _rules
+    if _rules is None:
+        _rules = RuleSet(list(LOCALES.values()))
+    return _rules
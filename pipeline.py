@@ -0,0 +1,64 @@
+import asyncio
+import contextvars
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared pool for pipeline stages started with submit() or offload(). The ASGI
+# server uses it to parse uploads off the event loop; the Flask views run
+# their stages in the request thread. Documents are rendered on download, so
+# no stage runs alongside the LLM call any more.
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", 8))
+
+executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix='pipeline')
+
+
+class Pipeline:
+    """Run the stages of one request, recording how long each one took"""
+
+    def __init__(self, pool=None):
+        self.pool = pool or executor
+        self.timings = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def run(self, name, fn, *args, **kwargs):
+        """Run a stage in the calling thread"""
+        return self._timed(name, fn, *args, **kwargs)
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Start a stage on the pool and return its Future"""
+        # Carry the caller's context, so spans inside the stage join its request trace
+        context = contextvars.copy_context()
+        return self.pool.submit(context.run, self._timed, name, fn, *args, **kwargs)
+
+    async def offload(self, name, fn, *args, **kwargs):
+        """Await a blocking stage run on the pool, leaving the event loop free"""
+        return await asyncio.wrap_future(self.submit(name, fn, *args, **kwargs))
+
+    async def wait(self, name, awaitable):
+        """Await a stage that is already asynchronous"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def _timed(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings[name] = seconds
+
+    def timings_ms(self):
+        """Per-stage and total wall time in milliseconds"""
+        with self._lock:
+            timings = {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()}
+        timings['total'] = round((time.perf_counter() - self._start) * 1000, 1)
+        return timings
@@ -0,0 +1,242 @@
+import marshal
+import sys
+from operator import attrgetter
+
+# Typed resume model: what ResumeParser extracts, as fixed-field records.
+# Records use __slots__ (no per-object __dict__) and read like the resume_data
+# dicts they stand for (record.get('name'), record['name']), so exporters and
+# ResumeGenerator take either. to_dict() gives the resume_data JSON shape and
+# from_dict() reads it back; to_bytes() is a compact binary form for caches.
+
+# Binary form: this header, then the records as nested tuples of field values
+# in __slots__ order (no field names), serialized with marshal. Only bytes
+# written by to_bytes are read back, never data from clients. marshal's format
+# may change between Python versions, so the header also names the version
+# that wrote the bytes; other versions refuse them with StaleFormat.
+BINARY_FORMAT = 2
+BINARY_HEADER = b'RM' + bytes((BINARY_FORMAT, *sys.version_info[:2]))
+
+
+class StaleFormat(ValueError):
+    """Resume bytes written in another binary format or by another Python version"""
+
+
+class Record:
+    """Base of the model's records: the fields are __slots__, in resume_data key order"""
+
+    __slots__ = ()
+    LIST_FIELDS = ()  # fields holding lists of strings; the others hold strings
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._values = attrgetter(*cls.__slots__)  # record -> tuple of its field values
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields.pop(name, None)
+            if value is None:
+                value = [] if name in self.LIST_FIELDS else ''
+            setattr(self, name, value)
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(fields)}")
+
+    def get(self, name, default=None):
+        """Field value like dict.get, for code written against resume_data"""
+        value = getattr(self, name, None) if name in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name):
+        return name in self.__slots__ and getattr(self, name) is not None
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_tuple() == other.to_tuple()
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def to_dict(self):
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data, what=None):
+        """Record from its resume_data dict; keys outside the model are dropped.
+
+        Raises ValueError if data is not a dict or a field has the wrong type;
+        what names data in the message (default: the class name).
+        """
+        what = what or cls.__name__
+        _check(isinstance(data, dict), what, 'an object')
+        fields = {}
+        for name in cls.__slots__:
+            value = data.get(name)
+            if value is not None:
+                _check_field(value, name in cls.LIST_FIELDS, f'{what}.{name}')
+                fields[name] = _plain(value)
+        return cls(**fields)
+
+    def to_tuple(self):
+        return self._values(self)
+
+    @classmethod
+    def from_tuple(cls, values):
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            setattr(record, name, value)
+        return record
+
+
+def _plain(value):
+    """A field value, lists copied"""
+    return list(value) if isinstance(value, list) else value
+
+
+def _check(valid, what, expected):
+    if not valid:
+        raise ValueError(f'{what} must be {expected}')
+
+
+def _check_field(value, is_list, what):
+    """Raise ValueError unless value is a string, or a list of strings for is_list"""
+    if is_list:
+        _check(isinstance(value, list) and all(isinstance(item, str) for item in value), what, 'a list of strings')
+    else:
+        _check(isinstance(value, str), what, 'a string')
+
+
+class PersonalInfo(Record):
+    __slots__ = ('name', 'email', 'phone', 'address', 'linkedin', 'github', 'website')
+
+
+class Education(Record):
+    __slots__ = ('institution', 'degree', 'major', 'period', 'gpa', 'description')
+
+
+class WorkExperience(Record):
+    __slots__ = ('company', 'position', 'period', 'location', 'description')
+    LIST_FIELDS = ('description',)
+
+
+class Project(Record):
+    __slots__ = ('name', 'description', 'technologies', 'period')
+    LIST_FIELDS = ('technologies',)
+
+
+class Certification(Record):
+    __slots__ = ('name', 'issuer', 'date')
+
+
+class Award(Record):
+    __slots__ = ('name', 'date')
+
+
+class Resume(Record):
+    """A parsed resume. Sections that were not extracted are None, and absent from to_dict()"""
+
+    __slots__ = ('personal_info', 'education', 'work_experience', 'skills', 'projects', 'certifications',
+                 'languages', 'awards', 'summary')
+    # Section -> record class of its value, or of its list items
+    RECORDS = {
+        'personal_info': PersonalInfo,
+        'education': Education,
+        'work_experience': WorkExperience,
+        'projects': Project,
+        'certifications': Certification,
+        'awards': Award,
+    }
+    LIST_FIELDS = ('skills', 'languages')  # the other sections without a record are strings
+
+    def __init__(self, **sections):
+        for name in self.__slots__:
+            setattr(self, name, sections.pop(name, None))
+        if sections:
+            raise TypeError(f"Unknown Resume sections: {', '.join(sections)}")
+
+    def to_dict(self):
+        """resume_data: the JSON shape the API has always returned"""
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if name == 'personal_info':
+                value = value.to_dict()
+            elif name in self.RECORDS:
+                value = [item.to_dict() for item in value]
+            elif isinstance(value, list):
+                value = list(value)
+            data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, resume_data):
+        """Resume from resume_data, e.g. a parse stored as JSON; to_dict() gives it back unchanged.
+
+        Raises ValueError if resume_data does not have the shape to_dict() gives,
+        so it can be used on resume_data sent by clients.
+        """
+        _check(isinstance(resume_data, dict), 'resume_data', 'an object')
+        sections = {}
+        for name in cls.__slots__:
+            value = resume_data.get(name)
+            if value is None:
+                continue
+            record = cls.RECORDS.get(name)
+            if record is PersonalInfo:
+                value = record.from_dict(value, name)
+            elif record is not None:
+                _check(isinstance(value, list), name, 'a list')
+                value = [record.from_dict(item, f'{name}[{i}]') for i, item in enumerate(value)]
+            else:
+                _check_field(value, name in cls.LIST_FIELDS, name)
+                value = _plain(value)
+            sections[name] = value
+        return cls(**sections)
+
+    def to_tuple(self):
+        values = []
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None and name == 'personal_info':
+                value = value.to_tuple()
+            elif value is not None and name in self.RECORDS:
+                value = tuple(item.to_tuple() for item in value)
+            values.append(value)
+        return tuple(values)
+
+    @classmethod
+    def from_tuple(cls, values):
+        resume = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            record = cls.RECORDS.get(name)
+            if value is not None and record is PersonalInfo:
+                value = record.from_tuple(value)
+            elif value is not None and record is not None:
+                value = [record.from_tuple(item) for item in value]
+            setattr(resume, name, value)
+        return resume
+
+    def to_bytes(self):
+        """Compact binary form, for caches; see BINARY_HEADER"""
+        return BINARY_HEADER + marshal.dumps(self.to_tuple())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Resume from to_bytes() output; raises StaleFormat for bytes this Python cannot read back"""
+        if data[:len(BINARY_HEADER)] != BINARY_HEADER:
+            if data[:2] == BINARY_HEADER[:2]:
+                raise StaleFormat('Resume bytes written by another format or Python version')
+            raise ValueError('Not a serialized Resume')
+        return cls.from_tuple(marshal.loads(data[len(BINARY_HEADER):]))
+
+
+def load_resume(value):
+    """Resume from a cached value: to_bytes() output, or resume_data stored as JSON by older versions"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return Resume.from_bytes(bytes(value))
+    return Resume.from_dict(value)
@@ -1,411 +1,498 @@
+import io
 import os
-import re
+import time
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from docx import Document
 import PyPDF2
 import pdfplumber
 
+from contacts import extract_contacts
+from metrics import span
+from parser_rules import get_rules
+from resume_model import Resume, PersonalInfo, Education, WorkExperience, Project, Certification, Award
+
+# Bump whenever extraction output changes, so cached parses are not reused
+PARSER_VERSION = '3'
+
+# PDF extraction limits, so a hostile document cannot hog a worker
+PDF_MAX_PAGES = 50  # pages beyond this are ignored
+PDF_TIMEOUT = 30  # seconds for the whole document
+PDF_PAGES_PER_TASK = 4  # pages extracted per pool task
+PDF_WORKERS = os.cpu_count() or 1  # 1 extracts in the calling process
+PDF_SPOOL_THRESHOLD = 1024 * 1024  # bytes; larger in-memory PDFs reach pool workers via a temp file
+
+# Result sections, in output order, and the methods that extract them
+SECTIONS = {
+    'personal_info': '_extract_personal_info',
+    'education': '_extract_education',
+    'work_experience': '_extract_work_experience',
+    'skills': '_extract_skills',
+    'projects': '_extract_projects',
+    'certifications': '_extract_certifications',
+    'languages': '_extract_languages',
+    'awards': '_extract_awards',
+    'summary': '_extract_summary',
+}
+
+
+class PDFTimeoutError(TimeoutError):
+    """PDF extraction ran out of PDF_TIMEOUT before reading every page"""
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def worker_context():
+    """multiprocessing context for worker pools: forkserver, or spawn where there is none.
+
+    Workers must not be forked from the threaded web server, which may hold locks mid-request.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _get_pdf_pool(workers):
+    """Return the shared process pool for PDF page extraction"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+        return _pdf_pool
+
+
+def _retire_pdf_pool(pool):
+    """Stop handing new work to pool, whose workers are stuck on pages past their deadline"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    # Work already queued by other parses still runs; the workers exit once idle
+    pool.shutdown(wait=False)
+
+
+def _open_source(source):
+    """File path as-is, or in-memory bytes as a fresh stream"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return source
+
+
+def _count_pdf_pages(source):
+    try:
+        with pdfplumber.open(_open_source(source)) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        return len(PyPDF2.PdfReader(_open_source(source)).pages)
+
+
+def _extract_pdf_pages(source, start, stop, deadline):
+    """Extract the text of pages [start, stop), falling back to PyPDF2 per page.
+
+    source is a file path or the PDF bytes. Runs in a pool worker. Stops
+    early, returning fewer pages, once the deadline (a time.time() value)
+    has passed.
+    """
+    texts = []
+    try:
+        plumber = pdfplumber.open(_open_source(source))
+    except Exception:
+        plumber = None
+    reader = None
+    try:
+        for number in range(start, stop):
+            if time.time() > deadline:
+                break
+            text = None
+            if plumber is not None:
+                try:
+                    text = plumber.pages[number].extract_text()
+                except Exception:
+                    text = None
+            if text is None:
+                # Fallback method, for this page only
+                try:
+                    if reader is None:
+                        reader = PyPDF2.PdfReader(_open_source(source))
+                    text = reader.pages[number].extract_text()
+                except Exception:
+                    text = ''
+            texts.append(text or '')
+    finally:
+        if plumber is not None:
+            plumber.close()
+    return texts
+
+
 class ResumeParser:
-    def __init__(self):
+    def __init__(self, rules=None, max_pages=PDF_MAX_PAGES, pdf_timeout=PDF_TIMEOUT, pdf_workers=PDF_WORKERS):
         self.text = ""
+        self.rules = rules or get_rules()
+        self.max_pages = max_pages
+        self.pdf_timeout = pdf_timeout
+        self.pdf_workers = pdf_workers
+        self._index = None
+        self._section_data = {}  # section name -> extracted value, for the current text
+    
+    @span
+    def parse(self, source, filename=None, sections=None):
+        """Parse resume file and extract structured information as resume_data
+        
+        source is a file path, the file's bytes, or a binary file-like object.
+        For bytes and streams, filename (only its extension is used) gives the format.
+        sections limits the result to those SECTIONS names; the rest are not
+        extracted unless asked for later with section().
+        """
+        return self.parse_model(source, filename, sections).to_dict()
     
-    def parse(self, filepath):
-        """Parse resume file and extract structured information"""
-        file_ext = os.path.splitext(filepath)[1].lower()
+    @span
+    def parse_model(self, source, filename=None, sections=None):
+        """Like parse, but return the Resume model instead of resume_data"""
+        if filename is None and not isinstance(source, (str, os.PathLike)):
+            raise ValueError("filename is required when parsing bytes or a stream")
+        if sections is not None:
+            unknown = [name for name in sections if name not in SECTIONS]
+            if unknown:
+                raise ValueError(f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(SECTIONS)}")
+        file_ext = os.path.splitext(filename or source)[1].lower()
+        if hasattr(source, 'read'):
+            source = source.read()
         
         if file_ext == '.pdf':
-            self.text = self._extract_from_pdf(filepath)
+            self.text = self._extract_from_pdf(source)
         elif file_ext in ['.doc', '.docx']:
-            self.text = self._extract_from_docx(filepath)
+            self.text = self._extract_from_docx(source)
         elif file_ext == '.txt':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                self.text = f.read()
+            if isinstance(source, bytes):
+                self.text = source.decode('utf-8')
+            else:
+                with open(source, 'r', encoding='utf-8') as f:
+                    self.text = f.read()
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
         
-        return self._extract_resume_data()
+        self._section_data = {}
+        return self._extract_resume(sections)
+    
+    def section(self, name):
+        """Extract one section (as model records) of the last parsed resume, computing it at most once"""
+        if name not in self._section_data:
+            if name not in SECTIONS:
+                raise ValueError(f"Unknown section: {name}")
+            self._section_data[name] = getattr(self, SECTIONS[name])()
+        return self._section_data[name]
     
-    def _extract_from_pdf(self, filepath):
-        """Extract text from PDF"""
-        text = ""
+    @span
+    def _extract_from_pdf(self, source):
+        """Extract text from PDF, farming page ranges out to a process pool
+        
+        Raises PDFTimeoutError if pdf_timeout passes before every page is read,
+        rather than returning part of the resume as if it were all of it.
+        """
+        page_count = min(_count_pdf_pages(source), self.max_pages)
+        deadline = time.time() + self.pdf_timeout
+        ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+                  for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+        
+        if len(ranges) <= 1 or self.pdf_workers <= 1:
+            chunks = [_extract_pdf_pages(source, start, stop, deadline) for start, stop in ranges]
+            return self._join_pages(chunks, page_count)
+        
+        # Large in-memory PDFs are written once to a temp file the workers share,
+        # instead of pickling the bytes into every task
+        spooled = None
+        if isinstance(source, bytes) and len(source) > PDF_SPOOL_THRESHOLD:
+            spooled = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+            with spooled:
+                spooled.write(source)
+            source = spooled.name
+        
         try:
-            with pdfplumber.open(filepath) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-        except:
-            # Fallback method
-            with open(filepath, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-        return text
+            pool = _get_pdf_pool(self.pdf_workers)
+            futures = [pool.submit(_extract_pdf_pages, source, start, stop, deadline)
+                       for start, stop in ranges]
+            chunks = []
+            for future in futures:
+                try:
+                    chunks.append(future.result(timeout=max(0, deadline - time.time())))
+                except FuturesTimeoutError:
+                    break
+            if len(chunks) < len(futures):
+                # Out of time. Queued ranges are dropped; a range still running keeps its worker
+                # until its current page is done, so later parses get a fresh pool
+                stuck = [future for future in futures if not future.cancel() and not future.done()]
+                if stuck:
+                    _retire_pdf_pool(pool)
+        finally:
+            if spooled is not None:
+                os.unlink(spooled.name)
+        
+        return self._join_pages(chunks, page_count)
+    
+    def _join_pages(self, chunks, page_count):
+        """Text of the extracted pages, or PDFTimeoutError if some were not reached"""
+        pages = [text for chunk in chunks for text in chunk]
+        if len(pages) < page_count:
+            raise PDFTimeoutError(f"PDF extraction timed out after {self.pdf_timeout}s "
+                                  f"({len(pages)} of {page_count} pages read)")
+        return ''.join(text + "\n" for text in pages)
     
-    def _extract_from_docx(self, filepath):
+    @span
+    def _extract_from_docx(self, source):
         """Extract text from Word document"""
-        doc = Document(filepath)
+        doc = Document(_open_source(source))
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
         return text
     
-    def _extract_resume_data(self):
-        """Extract structured resume data from text"""
-        lines = [line.strip() for line in self.text.split('\n') if line.strip()]
-        
-        resume_data = {
-            'personal_info': self._extract_personal_info(),
-            'education': self._extract_education(),
-            'work_experience': self._extract_work_experience(),
-            'skills': self._extract_skills(),
-            'projects': self._extract_projects(),
-            'certifications': self._extract_certifications(),
-            'languages': self._extract_languages(),
-            'awards': self._extract_awards(),
-            'summary': self._extract_summary()
-        }
-        
-        return resume_data
+    def _sections(self):
+        """Return the section index for the current text, segmenting it once"""
+        if self._index is None or self._index.text is not self.text:
+            self._index = self.rules.segmenter.segment(self.text)
+        return self._index
+    
+    def _extract_resume(self, sections=None):
+        """Extract a Resume from text, only the requested sections if given"""
+        return Resume(**{
+            name: self.section(name)
+            for name in SECTIONS
+            if sections is None or name in sections
+        })
     
+    @span
     def _extract_personal_info(self):
         """Extract personal information"""
-        info = {
-            'name': '',
-            'email': '',
-            'phone': '',
-            'address': '',
-            'linkedin': '',
-            'github': '',
-            'website': ''
-        }
-        
-        # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, self.text)
-        if emails:
-            info['email'] = emails[0]
-        
-        # Extract phone (supports English and Chinese formats)
-        phone_patterns = [
-            r'\+?[\d\s\-\(\)]{10,}',  # General format
-            r'1?\s*\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # English format
-            r'1[3-9]\d{9}',  # Chinese mobile: 138xxxxxxxx
-            r'\d{3}[-.\s]?\d{4}[-.\s]?\d{4}',  # Chinese mobile with separators
-            r'0\d{2,3}[-.\s]?\d{7,8}',  # Chinese landline
-        ]
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, self.text[:500])
-            if phones:
-                info['phone'] = phones[0].strip()
-                break
-        
-        # Extract LinkedIn
-        linkedin_pattern = r'linkedin\.com/in/[\w\-]+'
-        linkedin = re.search(linkedin_pattern, self.text, re.IGNORECASE)
-        if linkedin:
-            info['linkedin'] = 'https://' + linkedin.group()
-        
-        # Extract GitHub
-        github_pattern = r'github\.com/[\w\-]+'
-        github = re.search(github_pattern, self.text, re.IGNORECASE)
-        if github:
-            info['github'] = 'https://' + github.group()
-        
-        # Extract website
-        website_pattern = r'https?://(?!linkedin|github)[\w\.\-]+\.[a-z]{2,}'
-        website = re.search(website_pattern, self.text, re.IGNORECASE)
-        if website:
-            info['website'] = website.group()
+        # Email, phone (E.164) and profile links, read from the header in linear time
+        info = PersonalInfo(**extract_contacts(self.text, self.rules))
         
         # Extract name (usually at the beginning of the document)
-        first_lines = [line for line in self.text.split('\n')[:10] if line.strip()]
+        first_lines = [line for line in self._sections().lines[:10] if line.strip()]
         if first_lines:
             # Assume first or second line is the name
             potential_name = first_lines[0].strip()
             if len(potential_name.split()) <= 4 and not '@' in potential_name:
-                info['name'] = potential_name
+                info.name = potential_name
         
         return info
     
+    @span
     def _extract_education(self):
         """Extract education background"""
         education = []
-        # Support English and Chinese keywords
-        education_keywords = [
-            'education', 'university', 'college', 'degree', 'bachelor', 'master', 'phd', 'diploma', 'school',
-            '教育', '学历', '教育背景', '教育经历', '大学', '学院', '学校', '毕业', '学位', '本科', '硕士', '博士', '学士'
-        ]
-        
-        lines = self.text.split('\n')
+        index = self._sections()
+        headers = set(index.headers('education'))
+        lines = index.lines
+        lines_lower = index.lines_lower
+        degree_pattern = self.rules.degree
+        year_pattern = self.rules.YEAR
         current_edu = None
         
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in education_keywords):
+        for i in index.span('education'):
+            line = lines[i]
+            line_lower = lines_lower[i]
+            if i in headers:
                 if current_edu:
                     education.append(current_edu)
-                current_edu = {
-                    'institution': line.strip(),
-                    'degree': '',
-                    'major': '',
-                    'period': '',
-                    'gpa': '',
-                    'description': ''
-                }
+                current_edu = Education(institution=line.strip())
             elif current_edu:
-                # Extract degree (supports English and Chinese)
-                degree_patterns = [
-                    'bachelor', 'master', 'phd', 'doctor', 'associate', 'diploma',
-                    '本科', '学士', '硕士', '博士', '专科', '研究生', '博士研究生', '硕士研究生'
-                ]
-                for degree in degree_patterns:
-                    if degree in line_lower:
-                        current_edu['degree'] = line.strip()
-                        break
+                # Extract degree (keywords from every registered locale)
+                if degree_pattern and degree_pattern.search(line_lower):
+                    current_edu.degree = line.strip()
                 
                 # Extract time period
-                year_pattern = r'\d{4}'
-                years = re.findall(year_pattern, line)
-                if years:
-                    current_edu['period'] = line.strip()
+                if year_pattern.search(line):
+                    current_edu.period = line.strip()
         
         if current_edu:
             education.append(current_edu)
         
         return education[:5]  # Return maximum 5 entries
     
+    @span
     def _extract_work_experience(self):
         """Extract work experience"""
         experience = []
-        # Support English and Chinese keywords
-        work_keywords = [
-            'experience', 'employment', 'work', 'position', 'job', 'career', 'company',
-            '工作', '工作经历', '工作经验', '工作履历', '职业经历', '任职', '就职', '公司', '职位', '岗位'
-        ]
-        
-        lines = self.text.split('\n')
+        index = self._sections()
+        headers = set(index.headers('work_experience'))
+        lines = index.lines
+        lines_lower = index.lines_lower
+        year_pattern = self.rules.YEAR
         current_exp = None
         
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in work_keywords):
+        for i in index.span('work_experience'):
+            line = lines[i]
+            line_lower = lines_lower[i]
+            if i in headers:
                 if current_exp:
                     experience.append(current_exp)
-                current_exp = {
-                    'company': '',
-                    'position': '',
-                    'period': '',
-                    'location': '',
-                    'description': []
-                }
+                current_exp = WorkExperience()
                 # Try to extract company name and position (supports English and Chinese formats)
                 # English format: Position at Company or Position in Company
                 if 'at' in line_lower or 'in' in line_lower:
-                    parts = re.split(r'\s+at\s+|\s+in\s+', line, flags=re.IGNORECASE)
+                    parts = self.rules.AT_IN_SEPARATOR.split(line)
                     if len(parts) >= 2:
-                        current_exp['position'] = parts[0].strip()
-                        current_exp['company'] = parts[1].strip()
+                        current_exp.position = parts[0].strip()
+                        current_exp.company = parts[1].strip()
                 # Chinese format: Company | Position or Position | Company
                 elif '|' in line or '｜' in line:
-                    parts = re.split(r'\s*\|\s*|｜', line)
+                    parts = self.rules.PIPE_SEPARATOR.split(line)
                     if len(parts) >= 2:
                         # Determine which is company name and which is position (usually position comes first)
-                        current_exp['position'] = parts[0].strip()
-                        current_exp['company'] = parts[1].strip()
+                        current_exp.position = parts[0].strip()
+                        current_exp.company = parts[1].strip()
                 else:
-                    current_exp['company'] = line.strip()
+                    current_exp.company = line.strip()
             elif current_exp:
                 # Extract time period
-                year_pattern = r'\d{4}'
-                years = re.findall(year_pattern, line)
-                if years:
-                    current_exp['period'] = line.strip()
+                if year_pattern.search(line):
+                    current_exp.period = line.strip()
                 elif line.strip() and not line.strip().startswith('-'):
-                    if len(current_exp['description']) < 5:
-                        current_exp['description'].append(line.strip())
+                    if len(current_exp.description) < 5:
+                        current_exp.description.append(line.strip())
         
         if current_exp:
             experience.append(current_exp)
         
         return experience[:10]  # Return maximum 10 entries
     
+    @span
     def _extract_skills(self):
         """Extract skills"""
         skills = []
-        # Support English and Chinese keywords
-        skill_keywords = [
-            'skill', 'technical', 'proficiency', 'expertise', 'competence',
-            '技能', '专业技能', '技术技能', '能力', '专长', '技术', '掌握', '熟悉', '精通'
-        ]
+        index = self._sections()
+        headers = set(index.headers('skills'))
+        lines = index.lines
+        split_items = self.rules.LIST_SEPARATOR.split
         
-        lines = self.text.split('\n')
-        in_skills_section = False
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in skill_keywords):
-                in_skills_section = True
+        for i in index.span('skills'):
+            if i in headers:
                 continue
             
-            if in_skills_section:
-                # Extract skill items (usually separated by comma, semicolon, or newline)
-                if line.strip():
-                    skill_items = re.split(r'[,;|•\-\n]', line)
-                    for item in skill_items:
-                        item = item.strip()
-                        if item and len(item) > 1:
-                            skills.append(item)
-                    if len(skills) > 20:  # Limit number of skills
-                        break
+            # Extract skill items (usually separated by comma, semicolon, or newline)
+            line = lines[i]
+            if line.strip():
+                skill_items = split_items(line)
+                for item in skill_items:
+                    item = item.strip()
+                    if item and len(item) > 1:
+                        skills.append(item)
+                if len(skills) > 20:  # Limit number of skills
+                    break
         
         # If skills section not found, try to extract common technical terms from entire document
         if not skills:
-            common_skills = ['python', 'java', 'javascript', 'react', 'vue', 'angular', 
-                           'node', 'sql', 'mongodb', 'docker', 'kubernetes', 'aws', 
-                           'git', 'linux', 'html', 'css', 'typescript', 'spring', 
-                           'django', 'flask', 'express', 'mysql', 'postgresql']
             text_lower = self.text.lower()
-            for skill in common_skills:
+            for skill in self.rules.common_skills:
                 if skill in text_lower:
                     skills.append(skill.capitalize())
         
         return list(set(skills))[:30]  # Remove duplicates and limit quantity
     
+    @span
     def _extract_projects(self):
         """Extract project experience"""
         projects = []
-        # Support English and Chinese keywords
-        project_keywords = [
-            'project', 'portfolio', 'development',
-            '项目', '项目经验', '项目经历', '作品', '开发', '项目作品'
-        ]
-        
-        lines = self.text.split('\n')
+        index = self._sections()
+        headers = set(index.headers('projects'))
+        lines = index.lines
         current_project = None
         
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in project_keywords):
+        for i in index.span('projects'):
+            line = lines[i]
+            if i in headers:
                 if current_project:
                     projects.append(current_project)
-                current_project = {
-                    'name': line.strip(),
-                    'description': '',
-                    'technologies': [],
-                    'period': ''
-                }
+                current_project = Project(name=line.strip())
             elif current_project:
                 if line.strip():
-                    if not current_project['description']:
-                        current_project['description'] = line.strip()
+                    if not current_project.description:
+                        current_project.description = line.strip()
                     else:
-                        current_project['description'] += ' ' + line.strip()
+                        current_project.description += ' ' + line.strip()
         
         if current_project:
             projects.append(current_project)
         
         return projects[:10]
     
+    @span
     def _extract_certifications(self):
         """Extract certifications"""
         certifications = []
-        # Support English and Chinese keywords
-        cert_keywords = [
-            'certification', 'certificate', 'certified', 'license',
-            '证书', '认证', '资格证', '资质', '执照', '资格认证'
-        ]
-        
-        lines = self.text.split('\n')
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in cert_keywords):
-                cert = {
-                    'name': line.strip(),
-                    'issuer': '',
-                    'date': ''
-                }
-                # Extract date
-                year_pattern = r'\d{4}'
-                years = re.findall(year_pattern, line)
-                if years:
-                    cert['date'] = years[0]
-                certifications.append(cert)
+        index = self._sections()
+        
+        # Only keyword lines are certifications
+        for i in index.headers('certifications'):
+            line = index.lines[i]
+            cert = Certification(name=line.strip())
+            # Extract date
+            year = self.rules.YEAR.search(line)
+            if year:
+                cert.date = year.group()
+            certifications.append(cert)
         
         return certifications[:10]
     
+    @span
     def _extract_languages(self):
         """Extract language skills"""
         languages = []
-        # Support English and Chinese keywords
-        language_keywords = [
-            'language', 'languages', 'english', 'chinese', 'spanish', 'french', 'german',
-            '语言', '语言能力', '外语', '英语', '中文', '普通话', '粤语'
-        ]
+        index = self._sections()
+        headers = set(index.headers('languages'))
+        lines = index.lines
+        split_items = self.rules.LIST_SEPARATOR.split
         
-        lines = self.text.split('\n')
-        in_lang_section = False
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in language_keywords):
-                in_lang_section = True
+        for i in index.span('languages'):
+            if i in headers:
                 continue
             
-            if in_lang_section:
-                if line.strip():
-                    lang_items = re.split(r'[,;|•\-\n]', line)
-                    for item in lang_items:
-                        item = item.strip()
-                        if item:
-                            languages.append(item)
+            line = lines[i]
+            if line.strip():
+                lang_items = split_items(line)
+                for item in lang_items:
+                    item = item.strip()
+                    if item:
+                        languages.append(item)
         
         return languages[:10]
     
+    @span
     def _extract_awards(self):
         """Extract awards and honors"""
         awards = []
-        # Support English and Chinese keywords
-        award_keywords = [
-            'award', 'honor', 'achievement', 'recognition', 'prize',
-            '奖项', '荣誉', '奖励', '获奖', '成就', '表彰', '嘉奖'
-        ]
+        index = self._sections()
         
-        lines = self.text.split('\n')
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in award_keywords):
-                award = {
-                    'name': line.strip(),
-                    'date': ''
-                }
-                year_pattern = r'\d{4}'
-                years = re.findall(year_pattern, line)
-                if years:
-                    award['date'] = years[0]
-                awards.append(award)
+        # Only keyword lines are awards
+        for i in index.headers('awards'):
+            line = index.lines[i]
+            award = Award(name=line.strip())
+            year = self.rules.YEAR.search(line)
+            if year:
+                award.date = year.group()
+            awards.append(award)
         
         return awards[:10]
     
+    @span
     def _extract_summary(self):
         """Extract personal summary/objective"""
-        # Support English and Chinese keywords
-        summary_keywords = [
-            'summary', 'objective', 'profile', 'about', 'introduction',
-            '简介', '个人简介', '自我评价', '个人介绍', '概述', '个人概述', '职业目标'
-        ]
-        lines = self.text.split('\n')
+        index = self._sections()
+        headers = set(index.headers('summary'))
+        lines = index.lines
         
         summary_lines = []
-        in_summary = False
         
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in summary_keywords):
-                in_summary = True
+        for i in index.span('summary'):
+            if i in headers:
                 continue
             
-            if in_summary:
-                if line.strip():
-                    summary_lines.append(line.strip())
-                if len(summary_lines) >= 5:  # Limit summary length
-                    break
+            line = lines[i]
+            if line.strip():
+                summary_lines.append(line.strip())
+            if len(summary_lines) >= 5:  # Limit summary length
+                break
         
         return ' '.join(summary_lines)
-
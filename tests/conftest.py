@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ANALYSIS = '**KEYWORD GAP ANALYSIS**\n- docker\n**ACTIONABLE RECOMMENDATIONS**\n- add metrics'
+
+
+class FakeLLM:
+    """OpenAI-compatible chat completions server on localhost.
+
+    Answers with ANALYSIS after `delay` seconds; the statuses in `failures`
+    are returned first, one per call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.delay = 0.0
+        self.failures = []
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with fake._lock:
+                    fake.calls += 1
+                    status = fake.failures.pop(0) if fake.failures else 200
+                time.sleep(fake.delay)
+                if status != 200:
+                    self._send(status, {'error': {'message': f'status {status}'}})
+                    return
+                self._send(200, {
+                    'id': 'fake', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': ANALYSIS}}],
+                })
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_llm():
+    server = FakeLLM()
+    yield server
+    server.close()
@@ -0,0 +1,29 @@
+import time
+
+from candidates import CandidateStore
+
+JOB = 'Python developer with Kubernetes and Docker'
+
+
+def resume(name, skills):
+    return {'personal_info': {'name': name, 'email': f'{name.lower()}@example.com'}, 'skills': skills}
+
+
+def test_rank_leaves_email_out_unless_asked():
+    store = CandidateStore()
+    store.add('a', resume('Ann', ['Python', 'Kubernetes', 'Docker']))
+    store.add('b', resume('Bob', ['Python']))
+    results = store.rank(JOB)
+    assert [(r['document_id'], r['name']) for r in results] == [('a', 'Ann'), ('b', 'Bob')]
+    assert all('email' not in r for r in results)
+    assert store.rank(JOB, include_email=True)[0]['email'] == 'ann@example.com'
+
+
+def test_candidates_expire(tmp_path):
+    store = CandidateStore(str(tmp_path / 'candidates.sqlite'), max_age=0.05)
+    store.add('a', resume('Ann', ['Python']))
+    assert store.get('a') is not None
+    time.sleep(0.06)
+    assert store.get('a') is None
+    assert store.rank(JOB) == []
+    assert len(CandidateStore(str(tmp_path / 'candidates.sqlite'))) == 0
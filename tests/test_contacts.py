@@ -0,0 +1,25 @@
+from contacts import extract_contacts, CONTACT_HEADER_CHARS
+from parser_rules import get_rules
+from resume_parser import ResumeParser
+
+
+def test_links_after_header():
+    text = 'Jane Doe\n' + 'Lorem ipsum dolor sit amet.\n' * 60 + 'https://GitHub.com/jane https://Jane.Dev/work/'
+    assert len(text) > CONTACT_HEADER_CHARS
+    contacts = extract_contacts(text, get_rules())
+    assert contacts['github'] == 'https://github.com/jane'
+    assert contacts['website'] == 'https://jane.dev/work'
+
+
+def test_text_whose_lowercase_is_longer():
+    # 'İ'.lower() is two characters, so positions in text.lower() do not index text
+    text = 'John Doe\n' + 'Experience\n' * 100 + 'İstanbul\n' * 60 + 'https://linkedin.com/in/jdoe https://jdoe.dev'
+    contacts = extract_contacts(text, get_rules())
+    assert contacts['linkedin'] == 'https://linkedin.com/in/jdoe'
+    assert contacts['website'] == 'https://jdoe.dev'
+
+
+def test_parse_non_ascii_resume():
+    text = 'John Doe\n' + 'Experience\n' * 100 + 'İstanbul\n' * 60 + 'https://example.com'
+    resume_data = ResumeParser().parse(text.encode('utf-8'), 'resume.txt')
+    assert resume_data['personal_info']['website'] == 'https://example.com'
@@ -0,0 +1,22 @@
+from keywords import keyword_gap, vocabulary_index
+from parser_rules import get_rules
+
+
+def scan(text):
+    return list(vocabulary_index(get_rules()).scan(text))
+
+
+def test_plain_net_is_not_dotnet():
+    assert scan('we need a strong net engineer') == [('need', False), ('net', False), ('engineer', False)]
+
+
+def test_dotted_skills():
+    assert scan('C#/.NET, ASP.NET and dotnet') == [('c#', True), ('.net', True), ('asp.net', True), ('.net', True)]
+    # Other words lose a leading dot
+    assert scan('...pipelines') == [('pipeline', False)]
+
+
+def test_gap_does_not_credit_net_for_dotnet():
+    resume_data = {'summary': 'Network engineer with a strong safety net'}
+    gap = keyword_gap(resume_data, 'Senior .NET developer')
+    assert '.net' in gap['missing']
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from limits import AdaptiveLimiter, CircuitBreaker, Unavailable
+
+RESET = 0.05  # seconds the test breakers stay open
+
+
+def open_breaker(threshold=3):
+    breaker = CircuitBreaker('test', failure_threshold=threshold, reset_timeout=RESET)
+    for _ in range(threshold):
+        breaker.after_call(True, breaker.before_call())
+    return breaker
+
+
+def test_breaker_opens_after_failure_threshold():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=RESET)
+    for _ in range(2):
+        assert breaker.before_call() is False
+        breaker.after_call(True)
+    assert breaker.state == 'closed'
+    # A success resets the count of failures in a row
+    breaker.after_call(False, breaker.before_call())
+    for _ in range(2):
+        breaker.after_call(True, breaker.before_call())
+    assert breaker.state == 'closed'
+    breaker.after_call(True, breaker.before_call())
+    assert breaker.state == 'open'
+    assert breaker.stats()['opened'] == 1
+
+
+def test_open_breaker_rejects_calls():
+    breaker = open_breaker()
+    for _ in range(3):
+        with pytest.raises(Unavailable, match='circuit breaker open'):
+            breaker.before_call()
+    assert breaker.stats()['rejected'] == 3
+
+
+def test_half_open_lets_one_trial_through_and_closes():
+    breaker = open_breaker()
+    time.sleep(RESET)
+    assert breaker.before_call() is True
+    assert breaker.state == 'half_open'
+    # Only one trial at a time
+    with pytest.raises(Unavailable, match='half open'):
+        breaker.before_call()
+    breaker.after_call(False, trial=True)
+    assert breaker.state == 'closed'
+    assert breaker.before_call() is False
+
+
+def test_failed_trial_opens_again():
+    breaker = open_breaker()
+    time.sleep(RESET)
+    breaker.after_call(True, breaker.before_call())
+    assert breaker.state == 'open'
+    assert breaker.stats()['opened'] == 2
+    with pytest.raises(Unavailable):
+        breaker.before_call()
+
+
+def test_inconclusive_trial_leaves_breaker_half_open():
+    breaker = open_breaker()
+    time.sleep(RESET)
+    breaker.after_call(None, breaker.before_call())
+    assert breaker.state == 'half_open'
+    assert breaker.before_call() is True
+
+
+def test_limiter_decreases_on_overload_and_slow_calls():
+    limiter = AdaptiveLimiter('test', initial=10, latency_target=1.0, backoff=0.5)
+    limiter.acquire()
+    limiter.release(overloaded=True)
+    assert limiter.limit == 5
+    assert limiter.slow_start is False
+    limiter.acquire()
+    limiter.release(latency=2.0)  # over latency_target, as after a timeout
+    assert limiter.limit == 2.5
+    limiter = AdaptiveLimiter('test', initial=2, min_limit=2, backoff=0.5)
+    limiter.acquire()
+    limiter.release(overloaded=True)
+    assert limiter.limit == 2
+
+
+def test_limiter_increases_on_success():
+    limiter = AdaptiveLimiter('test', initial=2, max_limit=4, latency_target=1.0, backoff=0.5)
+    # Slow start: +1 per success while at least half the limit is in use
+    limiter.acquire()
+    limiter.release(latency=0.1)
+    assert limiter.limit == 3
+    limiter.acquire()
+    limiter.acquire()
+    limiter.release(latency=0.1)
+    assert limiter.limit == 4
+    # A success with most of the limit unused says nothing about a higher one
+    limiter.release(latency=0.1)
+    assert limiter.limit == 4
+    for _ in range(4):
+        limiter.acquire()
+    limiter.release(latency=0.1)
+    assert limiter.limit == 4  # max_limit
+    # After a decrease: +1/limit per success
+    limiter.release(overloaded=True)
+    assert limiter.limit == 2
+    limiter.release(latency=0.1)
+    assert limiter.limit == 2.5
+    limiter.release(latency=0.1)
+    assert limiter.limit == 2.5
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_limiter_acquire_waits_then_rejects():
+    limiter = AdaptiveLimiter('test', initial=1, queue_timeout=0.05)
+    limiter.acquire()
+    with pytest.raises(Unavailable, match='concurrency limit'):
+        limiter.acquire()
+    assert limiter.stats()['rejected'] == 1
+
+    # A waiting caller gets the slot when it is released
+    acquired = threading.Event()
+    limiter.queue_timeout = 2.0
+
+    def wait_for_slot():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=wait_for_slot)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1.0)
+    thread.join()
+    assert limiter.stats()['in_flight'] == 1
+
+
+def test_limiter_acquire_async():
+    limiter = AdaptiveLimiter('test', initial=1, queue_timeout=0.05)
+
+    async def run():
+        await limiter.acquire_async()
+        with pytest.raises(Unavailable):
+            await limiter.acquire_async()
+
+        # A waiting task is woken by a release from another thread
+        limiter.queue_timeout = 2.0
+        waiter = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        assert limiter.stats()['waiting'] == 1
+        threading.Thread(target=limiter.release).start()
+        await asyncio.wait_for(waiter, 1.0)
+
+    asyncio.run(run())
+    assert limiter.stats() == {'limit': 1, 'slow_start': True, 'in_flight': 1, 'waiting': 0,
+                               'admitted': 2, 'rejected': 1}
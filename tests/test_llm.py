@@ -0,0 +1,116 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+import pytest
+
+import llm
+from cache import TieredCache
+from conftest import ANALYSIS
+from limits import CircuitBreaker
+
+RESUME = {
+    'personal_info': {'name': 'Jane Doe'},
+    'sections': {'Skills': ['Python, Flask, SQL']},
+}
+JOB = 'We need a Python developer with Docker and Kubernetes experience.'
+
+
+@pytest.fixture
+def client(fake_llm, monkeypatch):
+    """Process-wide LLMClient talking to fake_llm, with an empty in-memory response cache"""
+    monkeypatch.setenv('PERPLEXITY_API', 'test-key')
+    client = llm.LLMClient(base_url=fake_llm.url, max_retries=2, backoff_base=0.01,
+                           breaker=CircuitBreaker('LLM test', 100, 30))
+    monkeypatch.setattr(llm, '_client', client)
+    monkeypatch.setattr(llm, 'response_cache', TieredCache(max_entries=16))
+    return client
+
+
+def test_cache_hit_makes_no_upstream_call(fake_llm, client):
+    prompt = llm.build_prompt(RESUME, JOB)
+    assert llm.analyze_prompt(prompt) == ANALYSIS
+    # Whitespace differences share the cache entry
+    assert llm.analyze_resume(RESUME, JOB + '  ') == ANALYSIS
+    assert fake_llm.calls == 1
+    assert client.requests == 1
+
+
+def test_concurrent_identical_prompts_make_one_call(fake_llm, client):
+    fake_llm.delay = 0.3
+    prompt = llm.build_prompt(RESUME, JOB)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: llm.analyze_prompt(prompt), range(8)))
+    assert results == [ANALYSIS] * 8
+    assert fake_llm.calls == 1
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_retries_back_off(fake_llm, client, monkeypatch, status):
+    fake_llm.failures = [status, status]
+    delays = []
+    backoff = client._backoff
+    monkeypatch.setattr(client, '_backoff', lambda attempt: delays.append(backoff(attempt)) or delays[-1])
+
+    assert llm.analyze_resume(RESUME, JOB) == ANALYSIS
+    assert fake_llm.calls == 3
+    assert client.retries == 2
+    # Full jitter: each delay is at most backoff_base * 2 ** attempt
+    assert len(delays) == 2
+    assert all(0 <= delay <= 0.01 * 2 ** attempt for attempt, delay in enumerate(delays))
+
+
+def test_retries_give_up(fake_llm, client):
+    fake_llm.failures = [429] * 5
+    with pytest.raises(openai.RateLimitError):
+        llm.analyze_resume(RESUME, JOB)
+    assert fake_llm.calls == client.max_retries + 1
+    assert client.errors == {'RateLimitError': 3}
+
+
+def test_client_errors_are_not_retried(fake_llm, client):
+    fake_llm.failures = [400]
+    with pytest.raises(openai.BadRequestError):
+        llm.analyze_resume(RESUME, JOB)
+    assert fake_llm.calls == 1
+    assert client.retries == 0
+
+
+def test_missing_key_is_counted_as_error(client, monkeypatch):
+    monkeypatch.delenv('PERPLEXITY_API')
+    with pytest.raises(ValueError, match='PERPLEXITY_API'):
+        client.chat(llm._messages('hello'))
+    metrics = client.metrics()
+    assert metrics['requests'] == 1
+    assert metrics['errors'] == {'ValueError': 1}
+    assert metrics['in_flight'] == 0
+
+
+def upload(app_module):
+    resume = b'Jane Doe\njane@example.com\n\nSkills\nPython, Flask, SQL\n'
+    response = app_module.app.test_client().post('/api/upload', data={
+        'file': (io.BytesIO(resume), 'resume.txt'),
+        'job_description': JOB,
+    })
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_keyword_gap_fallback_without_key(fake_llm, client, monkeypatch):
+    import app
+    monkeypatch.delenv('PERPLEXITY_API')
+    body = upload(app)
+    assert 'PERPLEXITY_API' in body['llm_error']
+    assert body['llm_analysis'] == app.format_gap(body['keyword_gap'])
+    assert 'docker' in body['keyword_gap']['missing']
+    assert fake_llm.calls == 0
+    assert client.metrics()['errors'] == {'ValueError': 1}
+
+
+def test_keyword_gap_fallback_when_upstream_fails(fake_llm, client):
+    import app
+    fake_llm.failures = [503] * 3
+    body = upload(app)
+    assert 'llm_error' in body
+    assert body['llm_analysis'] == app.format_gap(body['keyword_gap'])
+    assert fake_llm.calls == 3
@@ -0,0 +1,52 @@
+import io
+
+import pytest
+from docx import Document
+
+from exporters import resume_blocks
+from resume_generator import ResumeGenerator
+from resume_model import Resume
+
+RESUME = {
+    'personal_info': {'name': 'Jane Doe', 'email': 'jane@example.com', 'github': 'https://github.com/jane'},
+    'summary': 'Backend engineer.',
+    'work_experience': [{'position': 'Developer', 'company': 'Acme', 'period': '2019 - 2021',
+                         'description': ['Built the API', 'Cut latency by half']}],
+    'education': [{'degree': 'BSc', 'major': 'CS', 'institution': 'MIT', 'gpa': '3.9'}],
+    'skills': ['Python', 'SQL'],
+    'projects': [{'name': 'Jobsper', 'description': 'Resume parser', 'technologies': ['Flask']}],
+    'certifications': [{'name': 'AWS SA', 'issuer': 'Amazon'}],
+    'languages': ['English'],
+    'awards': [{'name': 'Hackathon winner', 'date': '2020'}],
+}
+
+
+@pytest.mark.parametrize('resume_data', [RESUME, Resume.from_dict(RESUME)])
+def test_docx_follows_resume_blocks(resume_data):
+    doc = Document(io.BytesIO(ResumeGenerator().render(resume_data)))
+    expected = [text.upper() if kind == 'section' else text for kind, text in resume_blocks(RESUME)]
+    assert [para.text for para in doc.paragraphs] == expected
+    styles = {para.text: para.style.name for para in doc.paragraphs}
+    assert styles['WORK EXPERIENCE'] == 'Resume Section'
+    assert styles['Built the API'] == 'List Bullet'
+
+
+@pytest.mark.parametrize('resume_data, error', [
+    ({'personal_info': 'x'}, 'personal_info must be an object'),
+    ([], 'resume_data must be an object'),
+    ({'skills': 'Python'}, 'skills must be a list of strings'),
+    ({'education': [{'gpa': 3.9}]}, 'education[0].gpa must be a string'),
+])
+def test_render_rejects_malformed_resume_data(resume_data, error):
+    import app
+    response = app.app.test_client().post('/api/render', json={'resume_data': resume_data})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+
+
+@pytest.mark.parametrize('fmt', ['docx', 'html', 'markdown', 'json'])
+def test_render(fmt):
+    import app
+    response = app.app.test_client().post(f'/api/render?format={fmt}', json={'resume_data': RESUME})
+    assert response.status_code == 200
+    assert response.data